@@ -0,0 +1,716 @@
+from typing import Dict, List
+
+from SparePart import SparePart, PartSize, CORROSION, PART_ENERGY, PART_MATERIAL, PART_SIZES
+from SurvivorBot import SurvivorBot
+from Drone import Drone
+from ScavengerSwarm import ScavengerSwarm
+
+try:
+    import numpy as np
+except ImportError:     # numpy is optional, only the vectorized paths need it
+    np = None
+
+
+DIRECTIONS = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+
+
+def wrapped_box_count(size: int, xs, ys, radius: int):
+    """
+    count, for every cell of a wrapping grid, how many of the given points
+    lie within `radius` cells (chebyshev distance). Returns a (size, size)
+    int32 array indexed [y, x].
+    """
+    occupancy = np.zeros((size, size), dtype=np.int32)
+    np.add.at(occupancy, (np.asarray(ys, dtype=np.intp), np.asarray(xs, dtype=np.intp)), 1)
+
+    # separable box sum; offsets are deduplicated so tiny grids don't count a point twice
+    offsets = {offset % size for offset in range(-radius, radius + 1)}
+    rows = sum(np.roll(occupancy, offset, axis=0) for offset in offsets)
+    return sum(np.roll(rows, offset, axis=1) for offset in offsets)
+
+
+class ArrayEngine:
+    """
+    Struct-of-arrays simulation engine for TechburgGrid (engine="numpy")
+
+    bots, parts, drones and swarms live in contiguous numpy columns instead
+    of Python objects and every phase of a step runs as batched array
+    operations. Stations stay RechargeStation objects (there are few of
+    them and their stored parts are lists).
+
+    the grid's `bots`, `parts`, `drones` and `swarms` are replaced by
+    read-only sequences of view objects, so display_tkinter and
+    SimulationState keep working. Views index the current arrays and are
+    only valid until the next step.
+
+    the phases follow simulate_step, but all entities of a phase act at
+    once: e.g. two bots heading for the same part both move and only the
+    first one (in list order) picks it up. Runs are therefore not
+    step-for-step identical to the object engine.
+    """
+
+    CHUNK = 1024    # rows per block for the pairwise bot/part distance search
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.size = grid.size
+        # seeded from the grid's RNG so a grid seed fixes the whole run
+        self.rng = np.random.default_rng(grid.rng.getrandbits(64))
+        self.next_uid = 0
+
+        # constants come from the entity classes so both engines agree
+        self.move_cost = SurvivorBot.movement_energy_cost
+        self.critical_energy = SurvivorBot.critical_energy_threshold
+        self.rest_threshold = SurvivorBot.rest_energy_threshold
+        self.regen_rate = SurvivorBot.regen_rate
+        self.bot_max_energy = SurvivorBot.base_max_energy
+        self.detection_range = Drone.detection_range
+        self.drone_recharge = Drone.recharge_rate
+        self.hibernation_threshold = Drone.hibernation_threshold
+        self.replication_threshold = ScavengerSwarm.replication_threshold
+        self.decay_range = ScavengerSwarm.decay_range
+
+        self.part_material = np.array([PART_MATERIAL[size] for size in PART_SIZES])
+        self.clear()
+
+    # ------------------------------------------------------------------ state
+
+    def clear(self) -> None:
+        """ drop every entity (stations included) """
+        self.bots = self._table(x=np.int64, y=np.int64, energy=np.float64, resting=bool,
+                                carry=np.int64, carry_value=np.float64, uid=np.int64)
+        self.parts = self._table(x=np.int64, y=np.int64, size=np.int64, value=np.float64, uid=np.int64)
+        self.drones = self._table(x=np.int64, y=np.int64, energy=np.float64, hibernating=bool,
+                                  pursuing=np.int64, uid=np.int64)
+        self.swarms = self._table(x=np.int64, y=np.int64, size=np.int64, consumed=np.int64, uid=np.int64)
+        self.station_map = np.full(self.size * self.size, -1, dtype=np.int64)
+        self.station_x = np.zeros(0, dtype=np.int64)
+        self.station_y = np.zeros(0, dtype=np.int64)
+        self._reset_routes()
+
+    def load(self) -> None:
+        """ move the grid's entity objects into the arrays and swap in views """
+        grid = self.grid
+        size_code = {size: code for code, size in enumerate(PART_SIZES)}
+
+        self.bots = self._rows(self.bots, [
+            (b.x, b.y, b.energy, b.resting,
+             size_code[b.carried_part.size] if b.carried_part else -1,
+             b.carried_part.enhancement_value if b.carried_part else 0.0,
+             self._uid()) for b in grid.bots])
+        self.parts = self._rows(self.parts, [
+            (p.x, p.y, size_code[p.size], p.enhancement_value, self._uid()) for p in grid.parts])
+        self.drones = self._rows(self.drones, [
+            (d.x, d.y, d.energy, d.is_hibernating, -1, self._uid()) for d in grid.drones])
+        self.swarms = self._rows(self.swarms, [
+            (s.x, s.y, s.size, s.consumed_material, self._uid()) for s in grid.swarms])
+
+        # only stations stay on the occupancy index (and in the registry)
+        for entities in (grid.bots, grid.parts, grid.drones, grid.swarms):
+            for entity in entities:
+                grid.index.remove(entity)
+                grid.registry.release(entity)
+        self._load_stations()
+
+    def load_tables(self, tables: Dict[str, dict]) -> None:
+        """
+        like load, but from columns instead of entity objects (e.g. Checkpoint.array)
+        - tables: "bots"/"parts"/"drones"/"swarms" -> anything indexable by column name;
+          fields the engine doesn't have are ignored and uids are assigned here
+        - a drone's `pursuing` is the row of its bot in tables["bots"] (or -1)
+        """
+        loaded = {}
+        for name in ("bots", "parts", "drones", "swarms"):
+            current = getattr(self, name)
+            columns = {column: np.array(tables[name][column], dtype=current[column].dtype)
+                       for column in current if column != "uid"}
+            count = len(columns["x"])
+            columns["uid"] = np.arange(self.next_uid + 1, self.next_uid + 1 + count, dtype=np.int64)
+            self.next_uid += count
+            loaded[name] = columns
+
+        pursuing = loaded["drones"]["pursuing"]
+        chasing = pursuing >= 0
+        pursuing[chasing] = loaded["bots"]["uid"][pursuing[chasing]]
+        for name, columns in loaded.items():
+            setattr(self, name, columns)
+        counters = self.grid.counters
+        counters.hibernating_drones = int(np.count_nonzero(self.drones["hibernating"]))
+        counters.swarm_size = int(self.swarms["size"].sum())
+        self._load_stations()
+
+    def _load_stations(self) -> None:
+        grid = self.grid
+        self.station_x = np.array([s.x for s in grid.stations], dtype=np.int64)
+        self.station_y = np.array([s.y for s in grid.stations], dtype=np.int64)
+        # the first station on a cell wins, like a scan over grid.stations
+        count = len(grid.stations)
+        self.station_map = np.full(self.size * self.size, count, dtype=np.int64)
+        np.minimum.at(self.station_map, self.station_y * self.size + self.station_x, np.arange(count))
+        self.station_map[self.station_map == count] = -1
+        self._reset_routes()
+        self.refresh_views()
+
+    def refresh_views(self) -> None:
+        self.grid.bots = EntityViews(self, "bots", BotView)
+        self.grid.parts = EntityViews(self, "parts", PartView)
+        self.grid.drones = EntityViews(self, "drones", DroneView)
+        self.grid.swarms = EntityViews(self, "swarms", SwarmView)
+
+    # ------------------------------------------------------------------- step
+
+    def step(self) -> None:
+        profiler = self.grid.profiler
+        if profiler is None:
+            self._station_phase()
+            self._swarm_phase()
+            self._cull()
+            self._drone_phase()
+            self._bot_phase()
+            self.refresh_views()
+            return
+
+        # same phases, timed under the names the object engine uses
+        lap = profiler.now()
+        self._station_phase()
+        lap = profiler.add("stations", lap)
+        self._swarm_phase()
+        lap = profiler.add("swarms", lap)
+        self._cull()
+        lap = profiler.add("cull", lap)
+        self._drone_phase()
+        lap = profiler.add("drones", lap)
+        self._bot_phase()
+        lap = profiler.add("bots", lap)
+        self.refresh_views()
+        profiler.add("views", lap)
+        profiler.end_step()
+
+    def _cull(self) -> None:
+        """ remove inactive bots """
+        dead = self.bots["energy"] <= 0
+        self._emit_at("death", self.bots, dead, cause="energy")
+        self.bots = self._compact(self.bots, ~dead)
+
+    def _station_phase(self) -> None:
+        bots = self.bots
+        if not len(self.grid.stations) or not len(bots["x"]):
+            return
+        station_of = self.station_map[bots["y"] * self.size + bots["x"]]
+        at_station = np.flatnonzero(station_of >= 0)
+        if not at_station.size:
+            return
+
+        guarded = np.zeros(len(self.grid.stations), dtype=bool)
+        if len(self.drones["x"]):
+            drone_station = self.station_map[self.drones["y"] * self.size + self.drones["x"]]
+            guarded[drone_station[drone_station >= 0]] = True
+
+        # bots at stations are few, so these are handled one by one in list order
+        energy = bots["energy"]
+        for i in at_station:
+            station = self.grid.stations[station_of[i]]
+            if guarded[station_of[i]]:
+                self._flee(i)
+                continue
+
+            if bots["carry"][i] >= 0 and station.can_store_part():
+                self._deposit(i, station)
+
+            if energy[i] <= self.critical_energy and station.stored_parts:
+                part = station.get_smallest_part()
+                energy[i] = min(self.bot_max_energy, energy[i] + PART_ENERGY[part.size] * 100)
+                station.take_part(part)
+            elif energy[i] < self.rest_threshold:
+                bots["resting"][i] = True
+                energy[i] = min(self.rest_threshold, energy[i] + self.regen_rate)
+
+    def _swarm_phase(self) -> None:
+        swarms = self.swarms
+        count = len(swarms["x"])
+        if not count:
+            return
+
+        # roam
+        step = np.array(DIRECTIONS)[self.rng.integers(0, 4, count)]
+        swarms["x"] = (swarms["x"] + step[:, 0]) % self.size
+        swarms["y"] = (swarms["y"] + step[:, 1]) % self.size
+
+        # consume parts and inactive bots; the first swarm on a cell gets everything there
+        owner = np.full(self.size * self.size, count, dtype=np.int64)
+        np.minimum.at(owner, swarms["y"] * self.size + swarms["x"], np.arange(count))
+
+        eaten_by = owner[self.parts["y"] * self.size + self.parts["x"]]
+        eaten = eaten_by < count
+        np.add.at(swarms["consumed"], eaten_by[eaten], self.part_material[self.parts["size"][eaten]])
+        self.parts = self._compact(self.parts, ~eaten)
+
+        eaten_by = owner[self.bots["y"] * self.size + self.bots["x"]]
+        eaten = (eaten_by < count) & (self.bots["energy"] <= 0)
+        self._emit_at("death", self.bots, eaten, cause="swarm")
+        np.add.at(swarms["consumed"], eaten_by[eaten], 5)
+        self.bots = self._compact(self.bots, ~eaten)
+
+        # replicas spawn next to their parent, so like in the object engine most are merged right back
+        self._replicate_swarms()
+        self._merge_swarms()
+
+        # decay field
+        hits = wrapped_box_count(self.size, self.swarms["x"], self.swarms["y"], self.decay_range)
+        bots = self.bots
+        drain = 3.0 * hits[bots["y"], bots["x"]]
+        alive = bots["energy"] > 0
+        bots["energy"][alive] = np.maximum(0.0, bots["energy"][alive] - drain[alive])
+        drones = self.drones
+        drain = 3.0 * hits[drones["y"], drones["x"]]
+        awake = ~drones["hibernating"]
+        drones["energy"][awake] = np.maximum(0.0, drones["energy"][awake] - drain[awake])
+
+    def _merge_swarms(self) -> None:
+        """ merge every cluster of swarms on the same or adjacent cells into its first member """
+        swarms = self.swarms
+        count = len(swarms["x"])
+        cells = swarms["y"] * self.size + swarms["x"]
+        offsets = {(ox % self.size, oy % self.size) for ox in (-1, 0, 1) for oy in (-1, 0, 1)}
+        label = np.arange(count)
+
+        # propagate the smallest label through neighbouring cells until nothing changes
+        while True:
+            lowest = np.full(self.size * self.size, count, dtype=np.int64)
+            np.minimum.at(lowest, cells, label)
+            merged = label.copy()
+            for ox, oy in offsets:
+                neighbour = ((swarms["y"] + oy) % self.size) * self.size + (swarms["x"] + ox) % self.size
+                merged = np.minimum(merged, lowest[neighbour])
+            if np.array_equal(merged, label):
+                break
+            label = merged
+
+        keep = label == np.arange(count)
+        if keep.all():
+            return
+        events = self._events()
+        if events is not None:
+            for i in np.flatnonzero(~keep):
+                events.emit("merge", int(swarms["x"][label[i]]), int(swarms["y"][label[i]]),
+                            absorbed=int(swarms["size"][i]))
+        swarms["size"] = np.bincount(label, weights=swarms["size"], minlength=count).astype(np.int64)
+        swarms["consumed"] = np.bincount(label, weights=swarms["consumed"], minlength=count).astype(np.int64)
+        self.swarms = self._compact(swarms, keep)
+
+    def _replicate_swarms(self) -> None:
+        """
+        the object engine's two rules, one after the other:
+        - a swarm with replication_threshold material spawns a size-1 swarm on a
+          random cell of its 3x3 neighbourhood, whatever is there (ScavengerSwarm._try_replicate)
+        - one that still has enough spawns another, but only onto a cell without
+          a station, bot or part (the check in TechburgGrid._step_objects)
+        """
+        swarms = self.swarms
+        spawned = []
+        for needs_free_cell in (False, True):
+            ready = np.flatnonzero(swarms["consumed"] >= self.replication_threshold)
+            if not ready.size:
+                break
+            new_x = (swarms["x"][ready] + self.rng.integers(-1, 2, ready.size)) % self.size
+            new_y = (swarms["y"][ready] + self.rng.integers(-1, 2, ready.size)) % self.size
+            if needs_free_cell:
+                occupied = self.station_map >= 0
+                occupied[self.bots["y"] * self.size + self.bots["x"]] = True
+                occupied[self.parts["y"] * self.size + self.parts["x"]] = True
+                free = ~occupied[new_y * self.size + new_x]
+                ready, new_x, new_y = ready[free], new_x[free], new_y[free]
+            swarms["consumed"][ready] -= self.replication_threshold
+            spawned += zip(new_x, new_y)
+        if not spawned:
+            return
+
+        self.grid.counters.swarm_size += len(spawned)
+        events = self._events()
+        if events is not None:
+            for x, y in spawned:
+                events.emit("replicate", int(x), int(y))
+        self.swarms = self._rows(swarms, [(x, y, 1, 0, self._uid()) for x, y in spawned])
+
+    def _drone_phase(self) -> None:
+        drones = self.drones
+        if not len(drones["x"]):
+            return
+        energy = drones["energy"]
+        hibernating = drones["hibernating"]
+
+        # entering hibernation takes the whole step
+        entering = (energy <= self.hibernation_threshold) & ~hibernating
+        hibernating[entering] = True
+        drones["pursuing"][entering] = -1
+
+        rest = ~entering
+        hibernating[rest & (energy >= 100.0)] = False
+        charging = rest & hibernating
+        energy[charging] = np.minimum(100.0, energy[charging] + self.drone_recharge)
+        hibernating[charging & (energy >= 100.0)] = False
+        # drones change state in bulk here, so the total is recounted rather than adjusted
+        counters = self.grid.counters
+        counters.hibernating_drones = int(np.count_nonzero(hibernating))
+
+        active = np.flatnonzero(rest & ~charging)
+        if not active.size:
+            return
+
+        target = self._drone_targets(active)
+        roamers = active[target < 0]
+        pursuers = active[target >= 0]
+        target = target[target >= 0]
+
+        # no bot nearby: roam
+        step = np.array(DIRECTIONS)[self.rng.integers(0, 4, roamers.size)]
+        drones["x"][roamers] = (drones["x"][roamers] + step[:, 0]) % self.size
+        drones["y"][roamers] = (drones["y"][roamers] + step[:, 1]) % self.size
+        energy[roamers] = np.maximum(0.0, energy[roamers] - 1.0)
+        drones["pursuing"][roamers] = -1
+
+        # caught: attack (60% shock -5%, 40% disable -20%, both drop the carried part)
+        bots = self.bots
+        caught = (drones["x"][pursuers] == bots["x"][target]) & (drones["y"][pursuers] == bots["y"][target])
+        attackers, victims = pursuers[caught], target[caught]
+        damage = np.where(self.rng.random(attackers.size) < 0.6, 5.0, 20.0)
+        events = self._events()
+        if events is not None:
+            for i, amount in zip(attackers, damage):
+                events.emit("attack", int(drones["x"][i]), int(drones["y"][i]),
+                            kind="shock" if amount == 5.0 else "disable")
+        np.subtract.at(bots["energy"], victims, damage)
+        np.maximum(bots["energy"], 0.0, out=bots["energy"])
+        self._drop_parts(np.unique(victims))
+        energy[attackers] = np.maximum(0.0, energy[attackers] - 2.0)
+        drones["pursuing"][attackers] = -1
+
+        # otherwise chase, at 20% energy per step
+        chasers, target = pursuers[~caught], target[~caught]
+        drones["x"][chasers], drones["y"][chasers] = self._next_step(
+            drones["x"][chasers], drones["y"][chasers], bots["x"][target], bots["y"][target])
+        energy[chasers] = np.maximum(0.0, energy[chasers] - 20.0)
+        drones["pursuing"][chasers] = bots["uid"][target]
+
+        exhausted = active[energy[active] <= self.hibernation_threshold]
+        hibernating[exhausted] = True
+        drones["pursuing"][exhausted] = -1
+        counters.hibernating_drones += exhausted.size
+
+    def _drone_targets(self, active):
+        """
+        bot index each active drone goes after, or -1 when no bot is in range
+        - a drone keeps its current target while any bot is in range
+        - otherwise it picks the closest bot in range (lowest index on ties)
+        """
+        bots, drones = self.bots, self.drones
+        count = len(bots["x"])
+        target = np.full(active.size, -1, dtype=np.int64)
+        if not count:
+            return target
+
+        # lowest bot index per cell, then look at every cell in detection range
+        first_bot = np.full(self.size * self.size, count, dtype=np.int64)
+        np.minimum.at(first_bot, bots["y"] * self.size + bots["x"], np.arange(count))
+        reach = self.detection_range
+        offsets = np.array(sorted({(ox % self.size, oy % self.size)
+                                   for ox in range(-reach, reach + 1)
+                                   for oy in range(-reach, reach + 1)}))
+        x, y = drones["x"][active], drones["y"][active]
+        cells = ((y[:, None] + offsets[:, 1]) % self.size) * self.size + (x[:, None] + offsets[:, 0]) % self.size
+        candidate = first_bot[cells]
+        valid = candidate < count
+        candidate = np.where(valid, candidate, 0)
+
+        dx = np.abs(bots["x"][candidate] - x[:, None])
+        dy = np.abs(bots["y"][candidate] - y[:, None])
+        dx = np.minimum(dx, self.size - dx)
+        dy = np.minimum(dy, self.size - dy)
+        key = np.where(valid, (dx * dx + dy * dy) * (count + 1) + candidate, np.iinfo(np.int64).max)
+        best = np.argmin(key, axis=1)
+        in_range = valid.any(axis=1)
+        target[in_range] = candidate[np.arange(active.size), best][in_range]
+
+        # keep chasing the current target if it's still alive
+        pursuing = drones["pursuing"][active]
+        found = np.searchsorted(bots["uid"], pursuing)
+        found = np.minimum(found, count - 1)
+        keep = in_range & (pursuing >= 0) & (bots["uid"][found] == pursuing)
+        target[keep] = found[keep]
+        return target
+
+    def _bot_phase(self) -> None:
+        bots = self.bots
+        active = ~bots["resting"] & (bots["energy"] > 0)
+        foragers = np.flatnonzero(active & (bots["carry"] < 0))
+        carriers = np.flatnonzero(active & (bots["carry"] >= 0))
+
+        if foragers.size and len(self.parts["x"]):
+            target = self._nearest_parts(foragers)
+            self._move_bots(foragers, self.parts["x"][target], self.parts["y"][target])
+            arrived = (bots["x"][foragers] == self.parts["x"][target]) & \
+                      (bots["y"][foragers] == self.parts["y"][target])
+            # first bot (in list order) on a part takes it
+            picked, first = np.unique(target[arrived], return_index=True)
+            winners = foragers[arrived][first]
+            events = self._events()
+            if events is not None:
+                for i in picked:
+                    events.emit("pickup", int(self.parts["x"][i]), int(self.parts["y"][i]),
+                                size=PART_SIZES[self.parts["size"][i]].name)
+            bots["carry"][winners] = self.parts["size"][picked]
+            bots["carry_value"][winners] = self.parts["value"][picked]
+            keep = np.ones(len(self.parts["x"]), dtype=bool)
+            keep[picked] = False
+            self.parts = self._compact(self.parts, keep)
+
+        if carriers.size and len(self.grid.stations):
+            station, next_cell = self._routes(bots["y"][carriers] * self.size + bots["x"][carriers])
+            self._move_bots(carriers, next_cell % self.size, next_cell // self.size, step_given=True)
+            arrived = (bots["x"][carriers] == self.station_x[station]) & \
+                      (bots["y"][carriers] == self.station_y[station])
+            for i, s in zip(carriers[arrived], station[arrived]):
+                self._deposit(i, self.grid.stations[s])
+
+        # Corrode parts, once per step (or once per active bot, see TechburgGrid's per_bot_corrosion)
+        ticks = int(active.sum()) if self.grid.per_bot_corrosion else 1
+        self.parts["value"] = np.maximum(0.0, self.parts["value"] - CORROSION * ticks)
+
+    # ---------------------------------------------------------------- helpers
+
+    def _nearest_parts(self, bots_index):
+        """ index of the nearest part for each bot (lowest index on ties) """
+        parts, size = self.parts, self.size
+        result = np.empty(bots_index.size, dtype=np.int64)
+        for start in range(0, bots_index.size, self.CHUNK):
+            chunk = bots_index[start:start + self.CHUNK]
+            dx = np.abs(parts["x"][None, :] - self.bots["x"][chunk, None])
+            dy = np.abs(parts["y"][None, :] - self.bots["y"][chunk, None])
+            dx = np.minimum(dx, size - dx)
+            dy = np.minimum(dy, size - dy)
+            result[start:start + self.CHUNK] = np.argmin(dx * dx + dy * dy, axis=1)
+        return result
+
+    def _routes(self, cells):
+        """ (nearest station, next cell towards it) per cell, filled in lazily like TechburgGrid's table """
+        missing = np.unique(cells[self.route_station[cells] < 0])
+        for start in range(0, missing.size, self.CHUNK):
+            chunk = missing[start:start + self.CHUNK]
+            x, y = chunk % self.size, chunk // self.size
+            dx = np.abs(self.station_x[None, :] - x[:, None])
+            dy = np.abs(self.station_y[None, :] - y[:, None])
+            dx = np.minimum(dx, self.size - dx)
+            dy = np.minimum(dy, self.size - dy)
+            station = np.argmin(dx * dx + dy * dy, axis=1)
+            next_x, next_y = self._next_step(x, y, self.station_x[station], self.station_y[station])
+            self.route_station[chunk] = station
+            self.route_next[chunk] = next_y * self.size + next_x
+        return self.route_station[cells], self.route_next[cells]
+
+    def _reset_routes(self) -> None:
+        self.route_station = np.full(self.size * self.size, -1, dtype=np.int64)
+        self.route_next = np.zeros(self.size * self.size, dtype=np.int64)
+
+    def _move_bots(self, index, target_x, target_y, step_given: bool = False) -> None:
+        """ move bots one step (or onto the given cells) if they can pay for it """
+        bots = self.bots
+        can_move = bots["energy"][index] >= self.move_cost
+        index, target_x, target_y = index[can_move], target_x[can_move], target_y[can_move]
+        if step_given:
+            new_x, new_y = target_x, target_y
+        else:
+            new_x, new_y = self._next_step(bots["x"][index], bots["y"][index], target_x, target_y)
+        bots["x"][index] = new_x
+        bots["y"][index] = new_y
+        bots["energy"][index] = np.maximum(0.0, bots["energy"][index] - self.move_cost)
+
+    def _next_step(self, x, y, target_x, target_y):
+        """ vectorized TechburgGrid._next_step """
+        half = self.size // 2
+        dx = (target_x - x + half) % self.size - half
+        dy = (target_y - y + half) % self.size - half
+        horizontal = np.abs(dx) > np.abs(dy)
+        new_x = np.where(horizontal, (x + np.where(dx > 0, 1, -1)) % self.size, x)
+        new_y = np.where(horizontal, y, (y + np.where(dy > 0, 1, -1)) % self.size)
+        return new_x, new_y
+
+    def _flee(self, i) -> None:
+        """ TechburgGrid._find_safe_position followed by a move, for one bot """
+        bots = self.bots
+        directions = list(DIRECTIONS)
+        self.grid.rng.shuffle(directions)
+        for dx, dy in directions:
+            new_x = (bots["x"][i] + dx) % self.size
+            new_y = (bots["y"][i] + dy) % self.size
+            ddx = np.abs(self.drones["x"] - new_x)
+            ddy = np.abs(self.drones["y"] - new_y)
+            near = np.maximum(np.minimum(ddx, self.size - ddx), np.minimum(ddy, self.size - ddy)) <= 1
+            if not near.any():
+                if bots["energy"][i] >= self.move_cost:
+                    bots["x"][i], bots["y"][i] = new_x, new_y
+                    bots["energy"][i] = max(0.0, bots["energy"][i] - self.move_cost)
+                return
+
+    def _deposit(self, i, station) -> None:
+        """ hand the carried part to a station (it's lost if the station is full, as in deposit_part) """
+        bots = self.bots
+        part = SparePart(station.x, station.y, PART_SIZES[bots["carry"][i]])
+        part.enhancement_value = float(bots["carry_value"][i])
+        if station.store_part(part):
+            events = self._events()
+            if events is not None:
+                events.emit("deposit", int(bots["x"][i]), int(bots["y"][i]), size=part.size.name)
+        bots["carry"][i] = -1
+
+    def _drop_parts(self, victims) -> None:
+        bots = self.bots
+        victims = victims[bots["carry"][victims] >= 0]
+        self.parts = self._rows(self.parts, [
+            (bots["x"][i], bots["y"][i], bots["carry"][i], bots["carry_value"][i], self._uid())
+            for i in victims])
+        bots["carry"][victims] = -1
+
+    def _events(self):
+        """ where to report events: the grid's MetricsSink, or its EventLog while it's recording; else None """
+        grid = self.grid
+        if grid.metrics is not None:
+            return grid.metrics
+        events = grid.events
+        return events if events is not None and events.recording else None
+
+    def _emit_at(self, event: str, table, rows, **fields) -> None:
+        """ log one event per selected row of a table, at that row's cell """
+        events = self._events()
+        if events is not None:
+            for x, y in zip(table["x"][rows], table["y"][rows]):
+                events.emit(event, int(x), int(y), **fields)
+
+    def _uid(self) -> int:
+        self.next_uid += 1
+        return self.next_uid
+
+    @staticmethod
+    def _table(**columns) -> Dict[str, "np.ndarray"]:
+        return {name: np.zeros(0, dtype=dtype) for name, dtype in columns.items()}
+
+    @staticmethod
+    def _compact(table, keep) -> Dict[str, "np.ndarray"]:
+        return {name: column[keep] for name, column in table.items()}
+
+    @staticmethod
+    def _rows(table, rows: List[tuple]) -> Dict[str, "np.ndarray"]:
+        """ append rows (tuples in column order) to a table """
+        if not rows:
+            return table
+        new_columns = zip(*rows)
+        return {name: np.concatenate([column, np.array(values, dtype=column.dtype)])
+                for (name, column), values in zip(table.items(), new_columns)}
+
+
+class EntityViews:
+    """ read-only sequence of views over one of the engine's tables """
+
+    def __init__(self, engine: ArrayEngine, table: str, view_class):
+        self.engine = engine
+        self.table = table
+        self.view_class = view_class
+
+    def __len__(self) -> int:
+        return len(getattr(self.engine, self.table)["x"])
+
+    def __getitem__(self, i: int):
+        count = len(self)
+        if i < 0:
+            i += count
+        if not 0 <= i < count:
+            raise IndexError(i)
+        return self.view_class(getattr(self.engine, self.table), i)
+
+    def __iter__(self):
+        columns = getattr(self.engine, self.table)
+        for i in range(len(self)):
+            yield self.view_class(columns, i)
+
+
+class EntityView:
+    """ one row of an engine table, exposing the attributes of the matching entity class """
+    __slots__ = ("columns", "i")
+
+    def __init__(self, columns, i: int):
+        self.columns = columns
+        self.i = i
+
+    @property
+    def x(self) -> int:
+        return int(self.columns["x"][self.i])
+
+    @property
+    def y(self) -> int:
+        return int(self.columns["y"][self.i])
+
+    @property
+    def uid(self) -> int:
+        return int(self.columns["uid"][self.i])
+
+    def __eq__(self, other) -> bool:
+        return type(other) is type(self) and other.uid == self.uid
+
+    def __hash__(self) -> int:
+        return hash((type(self), self.uid))
+
+
+class BotView(EntityView):
+    __slots__ = ()
+
+    @property
+    def energy(self) -> float:
+        return float(self.columns["energy"][self.i])
+
+    @property
+    def resting(self) -> bool:
+        return bool(self.columns["resting"][self.i])
+
+    @property
+    def carried_part(self):
+        code = self.columns["carry"][self.i]
+        if code < 0:
+            return None
+        part = SparePart(self.x, self.y, PART_SIZES[code])
+        part.enhancement_value = float(self.columns["carry_value"][self.i])
+        return part
+
+
+class PartView(EntityView):
+    __slots__ = ()
+
+    @property
+    def size(self) -> PartSize:
+        return PART_SIZES[self.columns["size"][self.i]]
+
+    @property
+    def enhancement_value(self) -> float:
+        return float(self.columns["value"][self.i])
+
+
+class DroneView(EntityView):
+    __slots__ = ()
+
+    @property
+    def energy(self) -> float:
+        return float(self.columns["energy"][self.i])
+
+    @property
+    def is_hibernating(self) -> bool:
+        return bool(self.columns["hibernating"][self.i])
+
+
+class SwarmView(EntityView):
+    __slots__ = ()
+
+    @property
+    def size(self) -> int:
+        return int(self.columns["size"][self.i])
+
+    @property
+    def consumed_material(self) -> int:
+        return int(self.columns["consumed"][self.i])
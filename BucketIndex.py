@@ -0,0 +1,142 @@
+from typing import Dict, List, Optional, Tuple
+
+
+class BucketIndex:
+    """
+    Bucketed spatial index on the wrapping (torus) grid
+
+    the grid is cut into square buckets of `bucket_size` cells. Nearest
+    queries search rings of buckets outwards from the query cell and stop
+    as soon as no unvisited bucket can hold anything closer, so they only
+    touch the neighbourhood of the answer.
+
+    every entity gets an insertion number when added; ties in distance are
+    broken by that number, which matches `min()` over the grid's lists
+    (entities are only ever appended to them)
+    """
+
+    def __init__(self, grid_size: int, bucket_size: int = 8):
+        self.grid_size = grid_size
+        self.bucket_size = max(1, min(bucket_size, grid_size))
+        self.num_buckets = -(-grid_size // self.bucket_size)        # ceil division
+        # the last bucket is narrower when bucket_size doesn't divide the grid
+        self.deficit = self.num_buckets * self.bucket_size - grid_size
+        self.buckets: Dict[Tuple[int, int], Dict[object, int]] = {}
+        self.order: Dict[object, int] = {}
+        self.counter = 0
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def add(self, entity) -> None:
+        self.order[entity] = self.counter
+        self.counter += 1
+        self.buckets.setdefault(self._bucket_of(entity.x, entity.y), {})[entity] = self.order[entity]
+
+    def remove(self, entity) -> None:
+        seq = self.order.pop(entity, None)
+        if seq is None:
+            return
+        key = self._bucket_of(entity.x, entity.y)
+        bucket = self.buckets[key]
+        del bucket[entity]
+        if not bucket:
+            del self.buckets[key]
+
+    def move(self, entity, new_x: int, new_y: int) -> None:
+        """ called before the entity's coordinates change """
+        if entity not in self.order:
+            return
+        old_key = self._bucket_of(entity.x, entity.y)
+        new_key = self._bucket_of(new_x, new_y)
+        if old_key != new_key:
+            seq = self.buckets[old_key].pop(entity)
+            if not self.buckets[old_key]:
+                del self.buckets[old_key]
+            self.buckets.setdefault(new_key, {})[entity] = seq
+
+    def clear(self) -> None:
+        self.buckets = {}
+        self.order = {}
+        self.counter = 0
+
+    def nearest(self, x: int, y: int):
+        """ returns the entity closest to (x, y) by wrapped euclidean distance, or None """
+        if not self.order:
+            return None
+
+        size = self.grid_size
+        num_buckets = self.num_buckets
+        qbx, qby = self._bucket_of(x, y)
+        best_key: Optional[Tuple[int, int]] = None
+        best = None
+        visited = set()
+
+        for ring in range(num_buckets // 2 + 1):
+            if ring > 0 and best_key is not None:
+                # anything in this ring or further out is at least this far away
+                lower_bound = (ring - 1) * self.bucket_size + 1 - self.deficit
+                if lower_bound > 0 and lower_bound * lower_bound > best_key[0]:
+                    break
+
+            for key in self._ring(qbx, qby, ring):
+                if key in visited:
+                    continue
+                visited.add(key)
+                bucket = self.buckets.get(key)
+                if not bucket:
+                    continue
+                for entity, seq in bucket.items():
+                    dx = abs(entity.x - x)
+                    dx = min(dx, size - dx)
+                    dy = abs(entity.y - y)
+                    dy = min(dy, size - dy)
+                    candidate = (dx * dx + dy * dy, seq)
+                    if best_key is None or candidate < best_key:
+                        best_key = candidate
+                        best = entity
+        return best
+
+    def within(self, x: int, y: int, radius: int) -> List:
+        """ entities within `radius` of (x, y) by wrapped chebyshev distance, in insertion order """
+        found = sorted(self._in_range(x, y, radius), key=lambda item: item[0])
+        return [entity for _, entity in found]
+
+    def any_within(self, x: int, y: int, radius: int) -> bool:
+        """ checks if any entity is within `radius` of (x, y) (wrapped chebyshev distance) """
+        return any(True for _ in self._in_range(x, y, radius))
+
+    def _in_range(self, x: int, y: int, radius: int):
+        """ (seq, entity) for the entities within `radius` of (x, y), only visiting the buckets the square overlaps """
+        size = self.grid_size
+        if 2 * radius + 1 >= size:
+            columns = rows = range(self.num_buckets)
+        else:
+            columns = {(x + offset) % size // self.bucket_size for offset in range(-radius, radius + 1)}
+            rows = {(y + offset) % size // self.bucket_size for offset in range(-radius, radius + 1)}
+        for bx in columns:
+            for by in rows:
+                bucket = self.buckets.get((bx, by))
+                if not bucket:
+                    continue
+                for entity, seq in bucket.items():
+                    dx = abs(entity.x - x)
+                    dy = abs(entity.y - y)
+                    if min(dx, size - dx) <= radius and min(dy, size - dy) <= radius:
+                        yield seq, entity
+
+    def _ring(self, qbx: int, qby: int, ring: int):
+        """ bucket keys at chebyshev bucket distance `ring` from (qbx, qby), wrapped """
+        n = self.num_buckets
+        if ring == 0:
+            yield (qbx, qby)
+            return
+        for ox in range(-ring, ring + 1):
+            yield ((qbx + ox) % n, (qby - ring) % n)
+            yield ((qbx + ox) % n, (qby + ring) % n)
+        for oy in range(-ring + 1, ring):
+            yield ((qbx - ring) % n, (qby + oy) % n)
+            yield ((qbx + ring) % n, (qby + oy) % n)
+
+    def _bucket_of(self, x: int, y: int) -> Tuple[int, int]:
+        return (x // self.bucket_size, y // self.bucket_size)
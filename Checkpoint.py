@@ -0,0 +1,211 @@
+import mmap
+import os
+import struct
+from typing import Dict, Iterator, Optional
+
+from SparePart import PART_SIZES
+
+
+MAGIC = b"TBCP"
+VERSION = 2
+READABLE = (1, 2)      # version 1 had no flags besides the engine, i.e. per-step corrosion
+
+# magic, version, flags, grid size, step count,
+# then the number of records in each section (in SECTIONS order)
+HEADER = struct.Struct("<4sHHIq6Q")
+NUMPY_ENGINE = 1            # flags: saved by the numpy engine
+PER_BOT_CORROSION = 2       # flags: the grid corrodes parts per active bot (see TechburgGrid)
+# random.Random state: version, 625 words of Mersenne Twister state, gauss_next (flag, value)
+RNG = struct.Struct("<B625I?d")
+# ArrayEngine's PCG64 state: present flag, state (lo, hi), inc (lo, hi), has_uint32, uinteger
+NUMPY_RNG = struct.Struct("<?4Q?I")
+
+# fixed-width little-endian records; field names match ArrayEngine's columns where they overlap
+SECTIONS = {
+    # stored parts of a station are rows first .. first + count - 1 of "stored_parts"
+    "stations": (("x", "i"), ("y", "i"), ("first", "I"), ("count", "I")),
+    "stored_parts": (("x", "i"), ("y", "i"), ("size", "b"), ("value", "d")),
+    # carry: size code of the carried part or -1
+    "bots": (("x", "i"), ("y", "i"), ("energy", "d"), ("rest_target", "d"), ("resting", "?"),
+             ("carry", "b"), ("carry_value", "d")),
+    "parts": (("x", "i"), ("y", "i"), ("size", "b"), ("value", "d")),
+    # pursuing: row of the pursued bot in "bots" or -1
+    "drones": (("x", "i"), ("y", "i"), ("energy", "d"), ("hibernating", "?"), ("pursuing", "q")),
+    "swarms": (("x", "i"), ("y", "i"), ("size", "q"), ("consumed", "q")),
+}
+RECORDS = {name: struct.Struct("<" + "".join(code for _, code in fields)) for name, fields in SECTIONS.items()}
+SIZE_CODE = {size: code for code, size in enumerate(PART_SIZES)}
+
+
+class Checkpoint:
+    """
+    A whole world saved to (and memory-mapped from) a compact binary file
+
+    layout: HEADER, RNG, NUMPY_RNG, then one block of fixed-width records per
+    section in SECTIONS order. Nothing is parsed up front: `rows` unpacks
+    records one at a time and `array` (with numpy) is a zero-copy
+    structured view of the mapped file, so a huge world can be inspected
+    without building an object per entity. Use TechburgGrid.save_checkpoint
+    and TechburgGrid.restore_from_checkpoint to write and resume one.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:      # empty file
+            self.file.close()
+            raise ValueError(f"{path} is not a checkpoint")
+
+        if self.buffer.size() < HEADER.size + RNG.size + NUMPY_RNG.size or self.buffer[:4] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a checkpoint")
+        magic, version, flags, self.size, self.step_count, *counts = HEADER.unpack_from(self.buffer, 0)
+        if version not in READABLE:
+            self.close()
+            raise ValueError(f"{path} is checkpoint version {version}, expected one of {READABLE}")
+        self.engine = "numpy" if flags & NUMPY_ENGINE else "object"
+        self.per_bot_corrosion = bool(flags & PER_BOT_CORROSION)
+        self.counts: Dict[str, int] = dict(zip(SECTIONS, counts))
+
+        rng = RNG.unpack_from(self.buffer, HEADER.size)
+        self.rng_state = (rng[0], rng[1:626], rng[627] if rng[626] else None)
+        has_numpy_rng, state_lo, state_hi, inc_lo, inc_hi, has_uint32, uinteger = \
+            NUMPY_RNG.unpack_from(self.buffer, HEADER.size + RNG.size)
+        self.numpy_rng_state: Optional[dict] = None
+        if has_numpy_rng:
+            self.numpy_rng_state = {
+                "bit_generator": "PCG64",
+                "state": {"state": state_hi << 64 | state_lo, "inc": inc_hi << 64 | inc_lo},
+                "has_uint32": int(has_uint32),
+                "uinteger": uinteger,
+            }
+
+        self.offsets: Dict[str, int] = {}
+        offset = HEADER.size + RNG.size + NUMPY_RNG.size
+        for name in SECTIONS:
+            self.offsets[name] = offset
+            offset += self.counts[name] * RECORDS[name].size
+        if offset > self.buffer.size():
+            self.close()
+            raise ValueError(f"{path} is truncated")
+
+    def __enter__(self) -> "Checkpoint":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """ unmap the file (arrays returned by `array` must be dropped first) """
+        self.buffer.close()
+        self.file.close()
+
+    def rows(self, section: str) -> Iterator[tuple]:
+        """ the records of `section` as tuples, unpacked lazily """
+        start = self.offsets[section]
+        end = start + self.counts[section] * RECORDS[section].size
+        return RECORDS[section].iter_unpack(memoryview(self.buffer)[start:end])
+
+    def row(self, section: str, i: int) -> tuple:
+        if not 0 <= i < self.counts[section]:
+            raise IndexError(f"{section} row {i} out of range")
+        return RECORDS[section].unpack_from(self.buffer, self.offsets[section] + i * RECORDS[section].size)
+
+    def array(self, section: str):
+        """ read-only numpy structured array over the mapped records of `section` """
+        from ArrayEngine import np
+        return np.frombuffer(self.buffer, dtype=self._dtype(section), count=self.counts[section],
+                             offset=self.offsets[section])
+
+    # ------------------------------------------------------------------ save
+
+    @classmethod
+    def save(cls, grid, path: str, step_count: int = 0) -> None:
+        """ write `grid` to `path` (through a temporary file, so an existing checkpoint is never half-overwritten) """
+        stored = [part for station in grid.stations for part in station.stored_parts]
+        if grid.engine is not None:
+            blocks = cls._engine_blocks(grid.engine)
+        else:
+            blocks = cls._object_blocks(grid)
+
+        stations, first = [], 0
+        for station in grid.stations:
+            stations.append(RECORDS["stations"].pack(station.x, station.y, first, len(station.stored_parts)))
+            first += len(station.stored_parts)
+        blocks["stations"] = (len(grid.stations), b"".join(stations))
+        blocks["stored_parts"] = (len(stored), b"".join(
+            RECORDS["stored_parts"].pack(p.x, p.y, SIZE_CODE[p.size], p.enhancement_value) for p in stored))
+
+        version, words, gauss = grid.rng.getstate()
+        flags = (NUMPY_ENGINE if grid.engine is not None else 0) | (PER_BOT_CORROSION if grid.per_bot_corrosion else 0)
+        header = HEADER.pack(MAGIC, VERSION, flags, grid.size, step_count,
+                             *(blocks[name][0] for name in SECTIONS))
+        rng = RNG.pack(version, *words, gauss is not None, gauss or 0.0)
+        numpy_rng = NUMPY_RNG.pack(False, 0, 0, 0, 0, False, 0)
+        if grid.engine is not None:
+            state = grid.engine.rng.bit_generator.state
+            mask = (1 << 64) - 1
+            numpy_rng = NUMPY_RNG.pack(True, state["state"]["state"] & mask, state["state"]["state"] >> 64,
+                                       state["state"]["inc"] & mask, state["state"]["inc"] >> 64,
+                                       bool(state["has_uint32"]), state["uinteger"])
+
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(header)
+            f.write(rng)
+            f.write(numpy_rng)
+            for name in SECTIONS:
+                f.write(blocks[name][1])
+        os.replace(temporary, path)
+
+    @staticmethod
+    def _object_blocks(grid) -> Dict[str, tuple]:
+        """ section -> (record count, bytes) for bots, parts, drones and swarms of an object-engine grid """
+        bot_rows = {bot: i for i, bot in enumerate(grid.bots)}
+        pack = {name: record.pack for name, record in RECORDS.items()}
+        return {
+            "bots": (len(grid.bots), b"".join(
+                pack["bots"](b.x, b.y, b.energy, b.rest_energy_target, b.resting,
+                             SIZE_CODE[b.carried_part.size] if b.carried_part else -1,
+                             b.carried_part.enhancement_value if b.carried_part else 0.0)
+                for b in grid.bots)),
+            "parts": (len(grid.parts), b"".join(
+                pack["parts"](p.x, p.y, SIZE_CODE[p.size], p.enhancement_value) for p in grid.parts)),
+            "drones": (len(grid.drones), b"".join(
+                pack["drones"](d.x, d.y, d.energy, d.is_hibernating, bot_rows.get(d.pursuing_bot, -1))
+                for d in grid.drones)),
+            "swarms": (len(grid.swarms), b"".join(
+                pack["swarms"](s.x, s.y, s.size, s.consumed_material) for s in grid.swarms)),
+        }
+
+    @classmethod
+    def _engine_blocks(cls, engine) -> Dict[str, tuple]:
+        """ same as _object_blocks, straight from the numpy engine's (an ArrayEngine's) columns """
+        from ArrayEngine import np
+        tables = {"bots": engine.bots, "parts": engine.parts, "drones": engine.drones, "swarms": engine.swarms}
+        bots = engine.bots
+        # the engine has no per-bot rest target: it always rests up to the threshold
+        rest_target = np.where(bots["resting"], engine.rest_threshold, 0.0)
+        # pursued bot uid -> row (uids are ascending in every table)
+        uids, pursuing = bots["uid"], engine.drones["pursuing"]
+        if len(uids):
+            row = np.minimum(np.searchsorted(uids, pursuing), len(uids) - 1)
+            pursuing = np.where((pursuing >= 0) & (uids[row] == pursuing), row, -1)
+        else:
+            pursuing = np.full(len(pursuing), -1)
+        extra = {"bots": {"rest_target": rest_target}, "drones": {"pursuing": pursuing}}
+
+        blocks = {}
+        for name, table in tables.items():
+            records = np.empty(len(table["uid"]), dtype=cls._dtype(name))
+            for field, _ in SECTIONS[name]:
+                records[field] = extra.get(name, {}).get(field, table.get(field))
+            blocks[name] = (len(records), records.tobytes())
+        return blocks
+
+    @staticmethod
+    def _dtype(section: str):
+        from ArrayEngine import np
+        return np.dtype([(field, "<" + code) for field, code in SECTIONS[section]])
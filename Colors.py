@@ -1,12 +1,12 @@
-COLORS = {
-    "empty": "white",
-    "recharge_station": "#a1f7b8",
-    "bot": "blue",
-    "spare_part_small": "yellow",
-    "spare_part_medium": "orange",
-    "spare_part_large": "dark orange",
-    "drone": "red",
-    "drone_hibernating": "purple",
-    "swarm": "#c57fe3",
-    "swarm_large": "#8947a6"
-}
+COLORS = {
+    "empty": "white",
+    "recharge_station": "#a1f7b8",
+    "bot": "blue",
+    "spare_part_small": "yellow",
+    "spare_part_medium": "orange",
+    "spare_part_large": "dark orange",
+    "drone": "red",
+    "drone_hibernating": "purple",
+    "swarm": "#c57fe3",
+    "swarm_large": "#8947a6"
+}
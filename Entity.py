@@ -1,4 +1,24 @@
-class Entity:
-    def __init__(self, x: int, y: int):
-        self.x = x
-        self.y = y
\ No newline at end of file
+class Entity:
+    # slots instead of a per-instance __dict__; subclasses list their own fields
+    # and keep per-type constants as class attributes
+    __slots__ = ("x", "y", "index", "events", "uid")
+
+    def __init__(self, x: int, y: int):
+        self.x = x
+        self.y = y
+        self.index = None       # SpatialIndex tracking this entity (set by the grid)
+        self.uid = None         # generational handle from the grid's EntityRegistry (set by the grid)
+        self.events = None      # EventLog or MetricsSink told what this entity does (set by the grid)
+
+    def _set_position(self, x: int, y: int) -> None:
+        """ move the entity, keeping the grid's occupancy index in sync """
+        if self.index is not None:
+            self.index.move(self, x, y)
+        else:
+            self.x = x
+            self.y = y
+
+    def _emit(self, event: str, **fields) -> None:
+        """ report an event at the entity's cell if the grid is recording or collecting metrics """
+        if self.events is not None:
+            self.events.emit(event, self.x, self.y, **fields)
@@ -0,0 +1,136 @@
+from typing import Dict, List, Optional
+
+
+SLOT_BITS = 32
+SLOT_MASK = (1 << SLOT_BITS) - 1
+
+
+class EntityRegistry:
+    """
+    Integer IDs for the entity objects on a TechburgGrid
+
+    an entity's `uid` is a generational handle, generation << SLOT_BITS | slot.
+    Slots are reused once their entity leaves the grid, but with the
+    generation bumped, so a handle kept after its entity was consumed,
+    culled or merged resolves to None instead of to whatever took the slot
+    over. IDs never repeat for the lifetime of a registry.
+    """
+
+    def __init__(self):
+        self.entities: List[Optional[object]] = []     # slot -> entity
+        self.generations: List[int] = []
+        self.free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.entities) - len(self.free)
+
+    def register(self, entity) -> int:
+        """ give an entity a new uid """
+        if self.free:
+            slot = self.free.pop()
+        else:
+            slot = len(self.entities)
+            self.entities.append(None)
+            self.generations.append(0)
+        self.entities[slot] = entity
+        entity.uid = self.generations[slot] << SLOT_BITS | slot
+        return entity.uid
+
+    def release(self, entity) -> None:
+        """ the entity left the grid: its uid stops resolving """
+        uid = entity.uid
+        if uid is None or self.get(uid) is not entity:
+            return
+        slot = uid & SLOT_MASK
+        self.entities[slot] = None
+        self.generations[slot] += 1
+        self.free.append(slot)
+        entity.uid = None
+
+    def get(self, uid: Optional[int]):
+        """ the entity a handle refers to, or None if it's gone """
+        if uid is None:
+            return None
+        slot = uid & SLOT_MASK
+        if slot >= len(self.entities) or self.generations[slot] != uid >> SLOT_BITS:
+            return None
+        return self.entities[slot]
+
+    def clear(self) -> None:
+        for entity in self.entities:
+            if entity is not None:
+                entity.uid = None
+        self.entities = [None] * len(self.entities)
+        self.generations = [generation + 1 for generation in self.generations]
+        self.free = list(reversed(range(len(self.entities))))
+
+
+class EntityList:
+    """
+    Insertion-ordered collection of a grid's entities with O(1) append, remove and `in`
+
+    - iterates like a list: entities appended during a loop are visited by it
+    - removal leaves a hole that's skipped, the holes are squeezed out once
+      they make up half the list (never while it's being iterated)
+    - with a registry, entities get a uid when appended and lose it when removed
+    """
+
+    def __init__(self, registry: Optional[EntityRegistry] = None, entities=()):
+        self.registry = registry
+        self.items: List[Optional[object]] = []     # entities in insertion order, None where one was removed
+        self.position: Dict[object, int] = {}       # entity -> its position in items
+        self.iterating = 0
+        for entity in entities:
+            self.append(entity)
+
+    def append(self, entity) -> None:
+        if entity in self.position:
+            raise ValueError(f"{entity!r} is already in the list")
+        if self.registry is not None:
+            self.registry.register(entity)
+        self.position[entity] = len(self.items)
+        self.items.append(entity)
+
+    def remove(self, entity) -> None:
+        position = self.position.pop(entity, None)
+        if position is None:
+            raise ValueError(f"{entity!r} is not in the list")
+        self.items[position] = None
+        if self.registry is not None:
+            self.registry.release(entity)
+        if not self.iterating and 2 * len(self.position) < len(self.items):
+            self._compact()
+
+    def __contains__(self, entity) -> bool:
+        return entity in self.position
+
+    def __len__(self) -> int:
+        return len(self.position)
+
+    def __iter__(self):
+        self.iterating += 1
+        try:
+            items = self.items
+            i = 0
+            while i < len(items):
+                entity = items[i]
+                i += 1
+                if entity is not None:
+                    yield entity
+        finally:
+            self.iterating -= 1
+
+    def __getitem__(self, i: int):
+        """ the i-th entity; O(1) unless the list has holes and is being iterated """
+        if len(self.items) != len(self.position):
+            if self.iterating:
+                return list(self)[i]
+            self._compact()
+        return self.items[i]
+
+    def __repr__(self) -> str:
+        return f"EntityList({list(self)!r})"
+
+    def _compact(self) -> None:
+        self.items = [entity for entity in self.items if entity is not None]
+        self.position = {entity: i for i, entity in enumerate(self.items)}
@@ -0,0 +1,140 @@
+import glob
+import json
+import os
+
+
+VERSION = 1
+META = "meta.json"
+EVENTS = "events.jsonl"
+KEYFRAME = "keyframe-{:010d}.tbcp"
+KEYFRAME_GLOB = "keyframe-*.tbcp"
+
+
+def keyframe_path(directory: str, step: int) -> str:
+    return os.path.join(directory, KEYFRAME.format(step))
+
+
+def keyframe_steps(directory: str) -> list:
+    """ steps that have a keyframe in `directory`, in order """
+    return sorted(int(os.path.basename(path)[9:-5]) for path in glob.glob(os.path.join(directory, KEYFRAME_GLOB)))
+
+
+class EventLog:
+    """
+    Append-only record of a run, written while the grid steps (see TechburgGrid.start_recording)
+
+    files in `directory` (a new log replaces whatever recording was there):
+    - meta.json: grid size, engine, seed and keyframe interval
+    - events.jsonl: one JSON object per line with the step it happened in,
+      the event, its cell and event-specific fields:
+        attack (kind: "shock" / "disable"), pickup (size), deposit (size, only
+        parts a station takes: a full one discards them unlogged),
+        death (cause: "energy" / "swarm"), merge (absorbed: size of the
+        absorbed swarm), replicate (at the new swarm)
+    - keyframe-<step>.tbcp: a Checkpoint of the world after <step>, every
+      `keyframe_interval` steps
+
+    when the world is changed by anything other than simulate_step (reset,
+    a restored history state, ...) the next step logs {"event": "rewind"}
+    at the step it continues from: events logged after that step belong to
+    the abandoned timeline, and keyframes after it are deleted. Replay.seek
+    is exact, so after one the log just stays quiet until the grid is past
+    the last logged step again.
+    """
+
+    def __init__(self, directory: str, grid, keyframe_interval: int = 1000):
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be at least 1")
+        os.makedirs(directory, exist_ok=True)
+        for step in keyframe_steps(directory):
+            os.remove(keyframe_path(directory, step))
+        self.directory = directory
+        self.keyframe_interval = keyframe_interval
+        self.meta = {
+            "version": VERSION,
+            "size": grid.size,
+            "engine": "object" if grid.engine is None else "numpy",
+            "seed": grid.seed,
+            "per_bot_corrosion": grid.per_bot_corrosion,
+            "keyframe_interval": keyframe_interval,
+            "first_step": grid.step_count,  # the first keyframe, which is never deleted
+            "last_step": grid.step_count,
+        }
+        self.file = open(os.path.join(directory, EVENTS), "w")
+        self.first_step = grid.step_count
+        self.step = grid.step_count         # step the emitted events belong to
+        self.last_step = grid.step_count    # last step that was logged
+        self.paused = False                 # set by Replay.seek while it re-simulates
+        self.replaying = False              # re-simulating steps that are already logged
+        self.diverged = False               # the world was changed outside simulate_step
+        self.keyframe(grid)
+
+    @property
+    def recording(self) -> bool:
+        return not (self.paused or self.replaying)
+
+    def emit(self, event: str, x: int, y: int, **fields) -> None:
+        if self.recording:
+            self._write({"step": self.step, "event": event, "x": x, "y": y, **fields})
+
+    def begin_step(self, grid) -> None:
+        """ called by simulate_step before the world changes """
+        if self.paused:
+            return
+        if self.replaying and grid.step_count >= self.last_step:
+            self.replaying = False
+        if not self.replaying and (self.diverged or grid.step_count != self.last_step):
+            self.rewind(grid)
+        self.step = grid.step_count + 1
+
+    def end_step(self, grid) -> None:
+        """ called by simulate_step once grid.step_count has been advanced """
+        if not self.recording:
+            return
+        self.last_step = grid.step_count
+        if grid.step_count % self.keyframe_interval == 0:
+            self.keyframe(grid)
+        self.file.flush()
+
+    def restored(self) -> None:
+        """ the world was replaced; the next step starts a new timeline """
+        self.diverged = True
+
+    def seeked(self) -> None:
+        """ the world was rebuilt exactly as it was logged (Replay.seek) """
+        self.diverged = False
+        self.replaying = True
+
+    def keyframe(self, grid) -> None:
+        grid.save_checkpoint(keyframe_path(self.directory, grid.step_count), grid.step_count)
+        self.meta["last_step"] = grid.step_count
+        self._write_meta()
+
+    def close(self) -> None:
+        if not self.file.closed:
+            self.file.close()
+            self.meta["last_step"] = self.last_step
+            self._write_meta()
+
+    def rewind(self, grid) -> None:
+        """ start a new timeline from the grid's current step """
+        step = grid.step_count
+        self._write({"step": step, "event": "rewind"})
+        for later in keyframe_steps(self.directory):
+            if later > step:
+                os.remove(keyframe_path(self.directory, later))
+        self.diverged = False
+        self.replaying = False
+        self.last_step = step
+        self.keyframe(grid)
+        self.file.flush()
+
+    def _write(self, record: dict) -> None:
+        self.file.write(json.dumps(record, separators=(",", ":")))
+        self.file.write("\n")
+
+    def _write_meta(self) -> None:
+        temporary = os.path.join(self.directory, META + ".tmp")
+        with open(temporary, "w") as file:
+            json.dump(self.meta, file, indent=2)
+        os.replace(temporary, os.path.join(self.directory, META))
@@ -0,0 +1,86 @@
+from typing import Dict, Optional, Tuple
+
+
+
+def entity_key(entity) -> int:
+    """ identity of a live entity that stays the same from frame to frame (its registry or engine uid) """
+    uid = entity.uid
+    return uid if uid is not None else id(entity)
+
+
+class Record:
+    """
+    Read-only copy of the drawable fields of one entity
+
+    records compare and hash by `key` (like EntityView does by uid), so a
+    renderer keeps the same canvas items for an entity across frames.
+    """
+
+    __slots__ = ("key",)
+
+    def __init__(self, **fields):
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __eq__(self, other) -> bool:
+        return type(other) is type(self) and other.key == self.key
+
+    def __hash__(self) -> int:
+        return hash((type(self), self.key))
+
+
+class StationRecord(Record):
+    __slots__ = ("x", "y", "stored_parts")     # stored_parts: tuple of PartSize
+
+
+class BotRecord(Record):
+    __slots__ = ("x", "y", "energy", "carried_part")     # carried_part: PartSize or None
+
+
+class PartRecord(Record):
+    __slots__ = ("x", "y", "size")
+
+
+class DroneRecord(Record):
+    __slots__ = ("x", "y", "energy", "is_hibernating")
+
+
+class SwarmRecord(Record):
+    __slots__ = ("x", "y", "size")
+
+
+class FrameSnapshot:
+    """
+    Immutable picture of a TechburgGrid after some step, safe to hand to another thread
+
+    it has the same stations/bots/parts/drones/swarms attributes as the grid
+    (as tuples of records), so the renderers draw it like a grid.
+    """
+
+    def __init__(self, grid, step_count: int, running: bool = False,
+                 can_step_back: bool = False, can_step_forward: bool = False, steps_per_sec: float = 0.0):
+        self.step_count = step_count
+        self.running = running
+        self.steps_per_sec = steps_per_sec     # achieved rate over the last second
+        self.can_step_back = can_step_back
+        self.can_step_forward = can_step_forward
+        self.profile: Optional[str] = grid.profiler.report() if grid.profiler is not None else None
+        self.population: Dict[str, int] = grid.population()     # see TechburgGrid.population
+
+        self.stations: Tuple[StationRecord, ...] = tuple(
+            StationRecord(key=entity_key(s), x=s.x, y=s.y, stored_parts=tuple(p.size for p in s.stored_parts))
+            for s in grid.stations)
+        self.bots: Tuple[BotRecord, ...] = tuple(
+            BotRecord(key=entity_key(b), x=b.x, y=b.y, energy=b.energy,
+                      carried_part=b.carried_part.size if b.carried_part else None)
+            for b in grid.bots)
+        self.parts: Tuple[PartRecord, ...] = tuple(
+            PartRecord(key=entity_key(p), x=p.x, y=p.y, size=p.size) for p in grid.parts)
+        self.drones: Tuple[DroneRecord, ...] = tuple(
+            DroneRecord(key=entity_key(d), x=d.x, y=d.y, energy=d.energy, is_hibernating=d.is_hibernating)
+            for d in grid.drones)
+        self.swarms: Tuple[SwarmRecord, ...] = tuple(
+            SwarmRecord(key=entity_key(s), x=s.x, y=s.y, size=s.size) for s in grid.swarms)
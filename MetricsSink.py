@@ -0,0 +1,138 @@
+import csv
+import json
+from typing import List, Optional
+
+
+# event (or (event, kind / cause)) -> column counting it
+EVENT_COLUMNS = {
+    "pickup": "pickups",
+    "deposit": "deposits",
+    "merge": "merges",
+    "replicate": "replications",
+    ("attack", "shock"): "shocks",
+    ("attack", "disable"): "disables",
+    ("death", "energy"): "deaths_energy",
+    ("death", "swarm"): "deaths_swarm",
+}
+COUNTED = tuple(EVENT_COLUMNS.values())
+COLUMNS = ("step", "bots", "mean_energy", "min_energy", "parts", "pickups", "deposits",
+           "shocks", "disables", "deaths_energy", "deaths_swarm", "active_drones", "hibernating_drones",
+           "swarms", "swarm_size", "merges", "replications", "stored_parts")
+FORMATS = ("csv", "jsonl")
+
+
+class MetricsSink:
+    """
+    Time series of a run, one row per sample, streamed to a CSV or JSON-lines file
+    (see TechburgGrid.start_metrics)
+
+    - a sample is taken after every `sample_every`-th step: population counts and
+      bot energy as they are after that step, plus event counts (pickups, attacks,
+      merges, ...) since the previous sample, so no event falls between samples
+    - `downsample` samples are combined into each row: event counts are summed,
+      min_energy is the minimum and the other columns are averaged
+    - rows are buffered and written `buffer_rows` at a time, steps in between
+      never touch the file
+    - one stored_<i> column per recharge station, in grid order
+
+    the grid reports events here instead of to its EventLog while both are
+    active, and the sink passes them on. After a reset or restore the rows
+    simply carry on with the world's new step numbers.
+    """
+
+    def __init__(self, path: str, grid, sample_every: int = 1, downsample: int = 1,
+                 buffer_rows: int = 1000, format: Optional[str] = None):
+        """ format: "csv" or "jsonl", by default from the file extension (.csv, otherwise jsonl) """
+        if sample_every < 1 or downsample < 1 or buffer_rows < 1:
+            raise ValueError("sample_every, downsample and buffer_rows must be at least 1")
+        if format is None:
+            format = "csv" if path.endswith(".csv") else "jsonl"
+        if format not in FORMATS:
+            raise ValueError(f"unknown format {format!r}, expected one of {FORMATS}")
+        self.path = path
+        self.format = format
+        self.sample_every = sample_every
+        self.downsample = downsample
+        self.buffer_rows = buffer_rows
+        self.columns = COLUMNS + tuple(f"stored_{i}" for i in range(len(grid.stations)))
+        self.log = None                         # the grid's EventLog, events are passed on to it
+        self.counts = dict.fromkeys(COUNTED, 0)   # events since the last sample
+        self.window: List[dict] = []            # samples waiting to be combined into a row
+        self.buffer: List[dict] = []            # rows waiting to be written
+        self.file = open(path, "w", newline="" if format == "csv" else None)
+        if format == "csv":
+            self.writer = csv.DictWriter(self.file, self.columns)
+            self.writer.writeheader()
+
+    def emit(self, event: str, x: int, y: int, **fields) -> None:
+        column = EVENT_COLUMNS.get(event) or EVENT_COLUMNS.get((event, fields.get("kind", fields.get("cause"))))
+        if column is not None:
+            self.counts[column] += 1
+        if self.log is not None:
+            self.log.emit(event, x, y, **fields)
+
+    def end_step(self, grid) -> None:
+        """ called by simulate_step once grid.step_count has been advanced """
+        if grid.step_count % self.sample_every:
+            return
+        self.window.append(self.sample(grid))
+        if len(self.window) == self.downsample:
+            self._add_row()
+
+    def sample(self, grid) -> dict:
+        """ the current metrics of `grid`, and the event counts since the last sample (which restart) """
+        if grid.engine is not None:
+            energy = grid.engine.bots["energy"]
+            mean_energy = float(energy.mean()) if len(energy) else None
+            min_energy = float(energy.min()) if len(energy) else None
+        else:
+            energy = [bot.energy for bot in grid.bots]
+            mean_energy = sum(energy) / len(energy) if energy else None
+            min_energy = min(energy) if energy else None
+
+        sample = {"step": grid.step_count, "mean_energy": mean_energy, "min_energy": min_energy,
+                  **grid.population(), **self.counts}
+        sample.update(zip(self.columns[len(COLUMNS):], (len(station.stored_parts) for station in grid.stations)))
+        self.counts = dict.fromkeys(COUNTED, 0)
+        return sample
+
+    def flush(self) -> None:
+        """ write the buffered rows """
+        if self.format == "csv":
+            self.writer.writerows(self.buffer)
+        else:
+            for row in self.buffer:
+                self.file.write(json.dumps(row, separators=(",", ":")))
+                self.file.write("\n")
+        self.buffer = []
+        self.file.flush()
+
+    def close(self) -> None:
+        """ write what's left (a partly filled window becomes a row of its own) and close the file """
+        if self.file.closed:
+            return
+        if self.window:
+            self._add_row()
+        self.flush()
+        self.file.close()
+
+    def _add_row(self) -> None:
+        window, self.window = self.window, []
+        if len(window) == 1:
+            row = window[0]
+        else:
+            row = {"step": window[-1]["step"]}
+            for column in self.columns[1:]:
+                values = [sample[column] for sample in window if sample.get(column) is not None]
+                if not values:
+                    row[column] = None
+                elif column in COUNTED:
+                    row[column] = sum(values)
+                elif column == "min_energy":
+                    row[column] = min(values)
+                else:
+                    row[column] = sum(values) / len(values)
+        row = {column: row.get(column) for column in self.columns}   # column order, for the JSON lines too
+        self.buffer.append(row)
+        if len(self.buffer) >= self.buffer_rows:
+            self.flush()
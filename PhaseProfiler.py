@@ -0,0 +1,58 @@
+from collections import deque
+from time import perf_counter
+from typing import Deque, Dict, Tuple
+
+
+class PhaseProfiler:
+    """
+    Records wall time and call counts per phase of simulate_step
+
+    each finished step is pushed into a rolling buffer of the last `history`
+    steps, so `summary()` describes recent behaviour rather than the whole run.
+    The grid only calls into the profiler when one is attached, so a
+    disabled profiler costs one `is not None` check per phase.
+    """
+
+    def __init__(self, history: int = 100):
+        self.history = history
+        self.steps: Deque[Dict[str, Tuple[float, int]]] = deque(maxlen=history)
+        self.current: Dict[str, Tuple[float, int]] = {}
+
+    @staticmethod
+    def now() -> float:
+        return perf_counter()
+
+    def add(self, phase: str, start: float, calls: int = 1) -> float:
+        """ charge the time since `start` to `phase`; returns the current time so laps can be chained """
+        end = perf_counter()
+        seconds, count = self.current.get(phase, (0.0, 0))
+        self.current[phase] = (seconds + end - start, count + calls)
+        return end
+
+    def end_step(self) -> None:
+        self.steps.append(self.current)
+        self.current = {}
+
+    def clear(self) -> None:
+        self.steps.clear()
+        self.current = {}
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """ per phase: mean milliseconds and mean calls per step over the buffered steps """
+        if not self.steps:
+            return {}
+        totals: Dict[str, Tuple[float, int]] = {}
+        for step in self.steps:
+            for phase, (seconds, count) in step.items():
+                total_seconds, total_count = totals.get(phase, (0.0, 0))
+                totals[phase] = (total_seconds + seconds, total_count + count)
+        num_steps = len(self.steps)
+        return {phase: {"ms_per_step": 1000.0 * seconds / num_steps, "calls_per_step": count / num_steps}
+                for phase, (seconds, count) in totals.items()}
+
+    def report(self) -> str:
+        """ one line per phase, slowest first """
+        summary = self.summary()
+        lines = [f"{phase}: {stats['ms_per_step']:.2f} ms ({stats['calls_per_step']:.0f} calls)"
+                 for phase, stats in sorted(summary.items(), key=lambda item: -item[1]["ms_per_step"])]
+        return "\n".join(lines)
@@ -0,0 +1,15 @@
+class PopulationCounters:
+    """
+    Running totals of a TechburgGrid that its entity lists can't answer by length
+
+    the grid, its engine and its stations adjust these where parts are stored
+    or consumed, drones fall asleep or wake up, and swarms appear or replicate,
+    so reading them costs O(1) however big the world is (see
+    TechburgGrid.population). Merging swarms moves size around but leaves the
+    total alone.
+    """
+
+    def __init__(self):
+        self.stored_parts = 0           # parts held by recharge stations
+        self.hibernating_drones = 0
+        self.swarm_size = 0             # sum of the sizes of all swarms
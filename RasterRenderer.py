@@ -0,0 +1,132 @@
+from typing import Dict, List, Tuple
+
+from Colors import COLORS
+from SparePart import PART_COLOR, PART_SIZES
+from TkRenderer import TkRenderer
+
+
+class RasterRenderer:
+    """
+    Framebuffer renderer for grids too large for one canvas item per entity
+
+    the world is painted into an RGB buffer in a single pass over the entity
+    lists (or straight from the numpy engine's arrays) and pushed to the canvas
+    as one PhotoImage:
+    - grids that fit the canvas get one pixel per cell, zoomed to the canvas
+    - bigger grids are painted at canvas size, each pixel covering a block of
+      cells; entities paint their block in layer order, so every entity shows
+      unless a higher layer (e.g. a bot over a part) shares its block
+    - the images are created once and refilled in place every frame
+    """
+
+    CANVAS_SIZE = TkRenderer.CANVAS_SIZE
+    # colors of named Tk colors used in Colors.COLORS, so frames can be built without asking Tk
+    NAMED_COLORS = {
+        "white": (255, 255, 255),
+        "black": (0, 0, 0),
+        "blue": (0, 0, 255),
+        "yellow": (255, 255, 0),
+        "orange": (255, 165, 0),
+        "dark orange": (255, 140, 0),
+        "red": (255, 0, 0),
+        "purple": (160, 32, 240),
+    }
+
+    def __init__(self, canvas, grid_size: int, photo_image=None):
+        """ photo_image: PhotoImage class to use, defaults to tkinter's (imported here so headless runs never load Tk) """
+        if photo_image is None:
+            from tkinter import PhotoImage
+            photo_image = PhotoImage
+        self.canvas = canvas
+        self.grid_size = grid_size
+        self.photo_image = photo_image
+        self.pixels = min(grid_size, self.CANVAS_SIZE)          # width and height of a built frame
+        self.scale = max(1, self.CANVAS_SIZE // grid_size)      # zoom from frame to canvas
+        # cell -> pixel row / column of the frame; several cells share one on big grids
+        self.cell_pixel: List[int] = [cell * self.pixels // grid_size for cell in range(grid_size)]
+        self.frame_image = None     # PhotoImage holding the built frame
+        self.image = None           # the one the canvas shows: frame_image, or a zoomed copy of it
+        self.image_item = None
+        self.palette: Dict[str, bytes] = {}
+
+    def render(self, world) -> None:
+        """ draw `world` (anything with stations/bots/parts/drones/swarms lists) """
+        pixels = self.pixels
+        if self.frame_image is None:
+            self.frame_image = self.image = self.photo_image(master=self.canvas, width=pixels, height=pixels)
+            if self.scale > 1:
+                side = pixels * self.scale
+                self.image = self.photo_image(master=self.canvas, width=side, height=side)
+
+        header = f"P6 {pixels} {pixels} 255\n".encode("ascii")
+        self.frame_image.configure(data=header + self.build_frame(world), format="PPM")
+        if self.image is not self.frame_image:
+            # zoom into the image on the canvas instead of making a new one (as PhotoImage.zoom does)
+            self.image.tk.call(self.image, "copy", self.frame_image, "-zoom", self.scale)
+
+        if self.image_item is None:
+            self.image_item = self.canvas.create_image(0, 0, image=self.image, anchor="nw")
+
+    def clear(self) -> None:
+        if self.image_item is not None:
+            self.canvas.delete(self.image_item)
+        self.image_item = None
+
+    def build_frame(self, world) -> bytes:
+        """ RGB bytes of the world, `pixels` x `pixels`, row by row (see cell_pixel) """
+        engine = getattr(world, "engine", None)     # a grid's ArrayEngine (engine="numpy")
+        if engine is not None:
+            return self._build_from_arrays(world, engine)
+
+        pixels = self.pixels
+        cell_pixel = self.cell_pixel
+        frame = bytearray(self._color("empty") * (pixels * pixels))
+        part_colors = {part_size: self._color(color) for part_size, color in PART_COLOR.items()}
+        layers = (
+            (world.parts, lambda part: part_colors[part.size]),
+            (world.stations, lambda station: self._color("recharge_station")),
+            (world.bots, lambda bot: self._color("bot")),
+            (world.drones, lambda drone: self._color("drone_hibernating" if drone.is_hibernating else "drone")),
+            (world.swarms, lambda swarm: self._color("swarm_large" if swarm.size > 1 else "swarm")),
+        )
+        # later layers paint over earlier ones, same stacking as the vector renderer
+        for entities, color_of in layers:
+            for entity in entities:
+                i = 3 * (cell_pixel[entity.y] * pixels + cell_pixel[entity.x])
+                frame[i:i + 3] = color_of(entity)
+        return bytes(frame)
+
+    def _build_from_arrays(self, world, engine) -> bytes:
+        from ArrayEngine import np
+        pixels = self.pixels
+        cell = np.array(self.cell_pixel, dtype=np.intp)
+        frame = np.empty((pixels, pixels, 3), dtype=np.uint8)
+        frame[:] = self._rgb("empty")
+
+        # layer by layer, like build_frame
+        part_colors = np.array([self._rgb(PART_COLOR[part_size]) for part_size in PART_SIZES], dtype=np.uint8)
+        frame[cell[engine.parts["y"]], cell[engine.parts["x"]]] = part_colors[engine.parts["size"]]
+        frame[cell[engine.station_y], cell[engine.station_x]] = self._rgb("recharge_station")
+        frame[cell[engine.bots["y"]], cell[engine.bots["x"]]] = self._rgb("bot")
+        drone_colors = np.array([self._rgb("drone"), self._rgb("drone_hibernating")], dtype=np.uint8)
+        frame[cell[engine.drones["y"]], cell[engine.drones["x"]]] = \
+            drone_colors[engine.drones["hibernating"].astype(np.intp)]
+        swarm_colors = np.array([self._rgb("swarm"), self._rgb("swarm_large")], dtype=np.uint8)
+        frame[cell[engine.swarms["y"]], cell[engine.swarms["x"]]] = \
+            swarm_colors[(engine.swarms["size"] > 1).astype(np.intp)]
+        return frame.tobytes()
+
+    def _color(self, name: str) -> bytes:
+        """ pixel bytes for a COLORS key or a Tk color name """
+        if name not in self.palette:
+            self.palette[name] = bytes(self._rgb(name))
+        return self.palette[name]
+
+    def _rgb(self, name: str) -> Tuple[int, int, int]:
+        color = COLORS.get(name, name)
+        if color.startswith("#") and len(color) == 7:
+            return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+        if color in self.NAMED_COLORS:
+            return self.NAMED_COLORS[color]
+        # anything else: ask Tk (16 bits per channel)
+        return tuple(channel >> 8 for channel in self.canvas.winfo_rgb(color))
@@ -1,33 +1,45 @@
-from Entity import Entity
-from SparePart import SparePart
-from typing import List, Optional
-
-
-class RechargeStation(Entity):
-    def __init__(self, x: int, y: int):
-        super().__init__(x, y)
-        self.stored_parts: List[SparePart] = []
-        self.current_bots: List[SurvivorBot] = []
-        self.max_bots = 5
-        self.max_parts = 5
-
-    def can_store_part(self) -> bool:
-        """Check if station can store more parts"""
-        return len(self.stored_parts) < self.max_parts
-
-    def store_part(self, part: SparePart) -> bool:
-        """Store a part if there's space"""
-        if self.can_store_part():
-            self.stored_parts.append(part)
-            return True
-        return False
-
-    # def can_accept_bot(self) -> bool:
-    #     return len(self.current_bots) < self.max_bots
-
-
-    def get_smallest_part(self) -> Optional[SparePart]:
-        """Get the smallest available part for consumption"""
-        if not self.stored_parts:
-            return None
-        return min(self.stored_parts, key=lambda p: p.size.value["boost"])
+from Entity import Entity
+from SparePart import SparePart, PART_BOOST
+from typing import List, Optional
+
+
+class RechargeStation(Entity):
+    __slots__ = ("stored_parts", "current_bots", "counters")
+
+    max_bots = 5
+    max_parts = 5
+
+    def __init__(self, x: int, y: int):
+        super().__init__(x, y)
+        self.stored_parts: List[SparePart] = []
+        self.current_bots: List[SurvivorBot] = []
+        self.counters = None        # the grid's PopulationCounters, kept up to date with stored_parts
+
+    def can_store_part(self) -> bool:
+        """Check if station can store more parts"""
+        return len(self.stored_parts) < self.max_parts
+
+    def store_part(self, part: SparePart) -> bool:
+        """Store a part if there's space"""
+        if self.can_store_part():
+            self.stored_parts.append(part)
+            if self.counters is not None:
+                self.counters.stored_parts += 1
+            return True
+        return False
+
+    def take_part(self, part: SparePart) -> None:
+        """Remove a stored part (e.g. consumed by a bot)"""
+        self.stored_parts.remove(part)
+        if self.counters is not None:
+            self.counters.stored_parts -= 1
+
+    # def can_accept_bot(self) -> bool:
+    #     return len(self.current_bots) < self.max_bots
+
+
+    def get_smallest_part(self) -> Optional[SparePart]:
+        """Get the smallest available part for consumption"""
+        if not self.stored_parts:
+            return None
+        return min(self.stored_parts, key=lambda p: PART_BOOST[p.size])
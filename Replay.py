@@ -0,0 +1,99 @@
+import json
+import os
+from typing import List, Optional
+
+from Checkpoint import Checkpoint
+from EventLog import EVENTS, META, keyframe_path, keyframe_steps
+from TechburgGrid import TechburgGrid
+
+
+class Replay:
+    """
+    Random access into a recording written by EventLog
+
+    seeking loads the nearest keyframe at or before the wanted step and
+    re-simulates forward from there, so it costs at most `keyframe_interval`
+    steps however long the run was. Checkpoints carry the RNG state, so the
+    re-simulated steps are the ones that were recorded.
+
+    the recording may still be growing (e.g. the GUI is recording it):
+    events are read incrementally and every call sees what's on disk.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, META)) as file:
+            self.meta = json.load(file)
+        self.size = self.meta["size"]
+        self.engine = self.meta["engine"]
+        self.seed = self.meta["seed"]
+        self.keyframe_interval = self.meta["keyframe_interval"]
+        self._events: List[dict] = []
+        self._offset = 0
+
+    def keyframes(self) -> List[int]:
+        return keyframe_steps(self.directory)
+
+    def last_step(self) -> int:
+        """ the last step the recording covers """
+        with open(os.path.join(self.directory, META)) as file:
+            last = json.load(file)["last_step"]
+        events = self._read()
+        return max(last, events[-1]["step"] if events else 0)
+
+    def events(self, first: int = 0, last: Optional[int] = None, event: Optional[str] = None) -> List[dict]:
+        """ logged events of steps first..last (inclusive), optionally only one kind, oldest first """
+        return [record for record in self._read()
+                if first <= record["step"] and (last is None or record["step"] <= last)
+                and (event is None or record["event"] == event)]
+
+    def seek(self, grid: TechburgGrid, step: int) -> int:
+        """
+        put `grid` in the state it was in after `step`; returns grid.step_count
+        - the grid must have the recording's size, its engine may differ (but
+          runs only match the recording on the engine it was made with)
+        - if `grid` is recording, nothing is logged until it's past the
+          steps that are already in its log
+        """
+        earlier = [keyframe for keyframe in self.keyframes() if keyframe <= step]
+        if not earlier:
+            raise ValueError(f"no keyframe at or before step {step}")
+
+        log = grid.events
+        if log is not None:
+            log.paused = True
+        try:
+            with Checkpoint(keyframe_path(self.directory, earlier[-1])) as checkpoint:
+                grid.restore_from_checkpoint(checkpoint)
+            while grid.step_count < step:
+                grid.simulate_step()
+            if log is not None:
+                log.seeked()
+        finally:
+            if log is not None:
+                log.paused = False
+        return grid.step_count
+
+    def load(self, step: int) -> TechburgGrid:
+        """ a new grid like the recorded one, at `step` """
+        grid = TechburgGrid(self.size, engine=self.engine, seed=self.seed,
+                            per_bot_corrosion=self.meta.get("per_bot_corrosion", False))
+        self.seek(grid, step)
+        return grid
+
+    def _read(self) -> List[dict]:
+        """ events logged so far, with the ones a rewind abandoned left out """
+        with open(os.path.join(self.directory, EVENTS)) as file:
+            file.seek(self._offset)
+            while True:
+                line = file.readline()
+                if not line.endswith("\n"):     # end of file, or a line still being written
+                    break
+                self._offset = file.tell()
+                record = json.loads(line)
+                if record["event"] == "rewind":
+                    while self._events and self._events[-1]["step"] > record["step"]:
+                        self._events.pop()
+                else:
+                    self._events.append(record)
+        return self._events
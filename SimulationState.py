@@ -0,0 +1,54 @@
+def part_record(part) -> tuple:
+    return (part.x, part.y, part.size)
+
+
+def station_record(station) -> tuple:
+    return (station.x, station.y, tuple(part_record(p) for p in station.stored_parts))
+
+
+def bot_record(bot) -> tuple:
+    return (bot.x, bot.y, bot.energy, part_record(bot.carried_part) if bot.carried_part else None)
+
+
+def drone_record(drone) -> tuple:
+    return (drone.x, drone.y, drone.energy, drone.is_hibernating)
+
+
+def swarm_record(swarm) -> tuple:
+    return (swarm.x, swarm.y, swarm.size, swarm.consumed_material)
+
+
+# entity list name -> function turning one entity into a plain, comparable tuple
+RECORDS = {
+    "stations": station_record,
+    "bots": bot_record,
+    "parts": part_record,
+    "drones": drone_record,
+    "swarms": swarm_record,
+}
+
+
+class SimulationState:
+    """
+    Plain-tuple copy of a grid's entities (see RECORDS), for restore_from_state
+
+    parts (stored or carried) are copied as (x, y, size) as well, so a saved
+    state shares nothing with the live grid.
+    """
+
+    def __init__(self, stations, bots, parts, drones, swarms, step_count):
+        self.stations = [station_record(s) for s in stations]
+        self.bots = [bot_record(b) for b in bots]
+        self.parts = [part_record(p) for p in parts]
+        self.drones = [drone_record(d) for d in drones]
+        self.swarms = [swarm_record(s) for s in swarms]
+        self.step_count = step_count
+
+    @classmethod
+    def from_records(cls, records: dict, step_count: int) -> "SimulationState":
+        """ records: entity list name -> iterable of record tuples """
+        state = cls.__new__(cls)
+        for name in RECORDS:
+            setattr(state, name, list(records[name]))
+        state.step_count = step_count
+        return state
@@ -0,0 +1,214 @@
+import queue
+import threading
+from collections import deque
+from time import perf_counter
+from typing import Deque, Optional, Tuple
+
+from FrameSnapshot import FrameSnapshot
+from Replay import Replay
+from SimulationState import SimulationState
+from StepHistory import StepHistory
+
+
+class SimulationWorker(threading.Thread):
+    """
+    Runs a TechburgGrid on its own thread, away from the Tk event loop
+
+    - only the worker touches the grid; the GUI sends commands with `send` and
+      draws whatever FrameSnapshot is in `frame`
+    - while running, steps are paced to `target_rate` steps/sec. Each tick runs
+      every step that is due (for at most `frame_interval` seconds), and a
+      frame is published at most once per `frame_interval`; frames the GUI
+      never got around to drawing are simply replaced
+    - the step back / step forward history (a StepHistory) lives here too,
+      since it restores into the grid
+    - with `recording` the run is logged there (see TechburgGrid.start_recording)
+      and the step buttons go on past the history: further back by seeking
+      to keyframes (see Replay), forward up to the last logged step
+
+    commands: start, stop, step_back, step_forward, reset, set_target_rate(steps_per_sec),
+    set_profiling(enabled), quit
+    """
+
+    RATE_WINDOW = 1.0   # seconds of frames the achieved steps/sec is averaged over
+
+    def __init__(self, grid, counts: dict, target_rate: float = 2.0, frame_interval: float = 1 / 60,
+                 history_bytes: int = 64 * 2 ** 20, recording: Optional[str] = None,
+                 keyframe_interval: int = 1000):
+        """
+        counts: initialize_simulation arguments, used again on reset
+        history_bytes: memory budget of the step back / step forward history
+        recording: directory to record the run to (EventLog), or None
+        """
+        super().__init__(name="simulation", daemon=True)
+        self.grid = grid
+        self.counts = counts
+        self.target_rate = target_rate
+        self.frame_interval = frame_interval
+        self.next_step = 0.0    # perf_counter time the next step is due at
+        # (time, step_count) of recent frames, for the achieved steps/sec
+        self.published: Deque[Tuple[float, int]] = deque()
+        self.commands: "queue.Queue[tuple]" = queue.Queue()
+        self.running = False
+        self.step_count = 0
+        self.history = StepHistory(history_bytes)
+        self.history.record(grid, self.step_count)
+        self.replay: Optional[Replay] = None
+        # the grid holds a StepHistory state, which isn't exactly the recorded one
+        self.approximate = False
+        if recording is not None:
+            grid.start_recording(recording, keyframe_interval)
+            self.replay = Replay(recording)
+        self.frame: Optional[FrameSnapshot] = None
+        self._publish()
+
+    def send(self, command: str, *args) -> None:
+        """ queue a command for the worker (safe from any thread) """
+        self.commands.put((command, args))
+
+    def run(self) -> None:
+        while True:
+            timeout = None
+            if self.running:
+                wake = self.next_step
+                if self.frame.step_count != self.step_count:    # steps not shown yet
+                    wake = min(wake, self.published[-1][0] + self.frame_interval)
+                timeout = max(0.0, wake - perf_counter())
+            try:
+                command, args = self.commands.get(timeout=timeout)
+            except queue.Empty:
+                command = None
+
+            if command == "quit":
+                self.grid.stop_recording()
+                return
+            if command is not None:
+                getattr(self, f"_command_{command}")(*args)
+                self._publish()
+                continue
+            self._tick()
+
+    # -------------------------------------------------------------- internals
+
+    def _tick(self) -> None:
+        """ run the steps that are due, then publish a frame if one is due """
+        start = perf_counter()
+        while self.running and perf_counter() >= self.next_step:
+            self._step()
+            self.next_step += 1.0 / self.target_rate
+            if perf_counter() - start >= self.frame_interval:
+                # behind schedule: drop the backlog instead of trying to catch up on it later
+                self.next_step = max(self.next_step, perf_counter())
+                break
+        if self.frame.step_count != self.step_count and \
+                perf_counter() - self.published[-1][0] >= self.frame_interval:
+            self._publish()
+
+    def _publish(self) -> None:
+        now = perf_counter()
+        published = self.published
+        published.append((now, self.step_count))
+        # keep one frame at or before the start of the window, so slow rates still have two points
+        while len(published) > 1 and now - published[1][0] >= self.RATE_WINDOW:
+            published.popleft()
+        first_time, first_step = published[0]
+        if not self.running:
+            rate = 0.0
+        elif now - first_time < self.RATE_WINDOW / 4:
+            rate = self.frame.steps_per_sec     # too soon after starting to tell
+        else:
+            rate = (self.step_count - first_step) / (now - first_time)
+
+        # rebinding an attribute is atomic, so the GUI always sees a whole frame
+        self.frame = FrameSnapshot(self.grid, self.step_count, self.running,
+                                   self._can_step_back(), self._can_step_forward(), rate)
+
+    def _can_step_back(self) -> bool:
+        if self.history.can_step_back():
+            return True
+        return self.replay is not None and self.step_count > self.grid.events.first_step
+
+    def _can_step_forward(self) -> bool:
+        if self.history.can_step_forward():
+            return True
+        return self.replay is not None and self.step_count < self.grid.events.last_step
+
+    def _restore(self, state: SimulationState) -> None:
+        self.grid.clear_entities()
+        self.grid.restore_from_state(state)
+        self.step_count = state.step_count
+        self.history.restored()
+        self.approximate = self.replay is not None
+
+    def _seek(self, step: int) -> None:
+        """ rebuild the recorded state after `step`, refilling the history from the keyframe before it """
+        keyframe = max(keyframe for keyframe in self.replay.keyframes() if keyframe <= step)
+        self.step_count = self.replay.seek(self.grid, keyframe)
+        self.approximate = False
+        self.history.clear()
+        self.history.record(self.grid, self.step_count)
+        while self.step_count < step:
+            self._step()
+
+    def _step(self) -> None:
+        self.grid.simulate_step()
+        self.step_count += 1
+        self.history.record(self.grid, self.step_count)    # record the new simulation state
+
+    # --------------------------------------------------------------- commands
+
+    def _command_start(self) -> None:
+        if not self.running:
+            if self.approximate and self.step_count <= self.grid.events.last_step:
+                self._seek(self.step_count)     # carry on with the recorded run, not a copy of it
+            self.running = True
+            self.next_step = perf_counter()
+            self.published.clear()
+
+    def _command_stop(self) -> None:
+        self.running = False
+
+    def _command_step_back(self) -> None:
+        """ move one step backward in simulation """
+        if not self._can_step_back():
+            return
+        self.running = False
+        if self.history.can_step_back():
+            self._restore(self.history.step_back())
+        else:
+            self._seek(self.step_count - 1)
+
+    def _command_step_forward(self) -> None:
+        """ move one step forward in simulation """
+        if not self._can_step_forward():
+            return
+        self.running = False
+        if self.history.can_step_forward():
+            self._restore(self.history.step_forward())
+        elif self.approximate:
+            self._seek(self.step_count + 1)
+        else:
+            self._step()
+
+    def _command_reset(self) -> None:
+        """ reset the simulation with new entities """
+        self.running = False
+        self.step_count = 0
+        self.grid.clear_entities()
+        self.grid.initialize_simulation(**self.counts)
+        if self.replay is not None:
+            self.grid.events.rewind(self.grid)
+            self.approximate = False
+        self.history.clear()
+        self.history.record(self.grid, self.step_count)
+
+    def _command_set_target_rate(self, target_rate: float) -> None:
+        self.target_rate = target_rate
+        # speeding up shouldn't have to wait for a step scheduled at the old, slower rate
+        self.next_step = min(self.next_step, perf_counter() + 1.0 / target_rate)
+
+    def _command_set_profiling(self, enabled: bool) -> None:
+        if enabled:
+            self.grid.enable_profiling()
+        else:
+            self.grid.disable_profiling()
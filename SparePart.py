@@ -1,19 +1,63 @@
-from Entity import Entity
-from enum import Enum
-from Colors import COLORS
-
-
-class PartSize(Enum):
-    SMALL = {"boost": 0.03, "energy": 0.01, "color": COLORS["spare_part_small"]}
-    MEDIUM = {"boost": 0.05, "energy": 0.02, "color": COLORS["spare_part_medium"]}
-    LARGE = {"boost": 0.07, "energy": 0.03, "color": COLORS["spare_part_large"]}
-
-
-class SparePart(Entity):
-    def __init__(self, x: int, y: int, size: PartSize):
-        super().__init__(x, y)
-        self.size = size
-        self.enhancement_value = size.value["boost"]
-        
-    def corrode(self):
-        self.enhancement_value = max(0, self.enhancement_value - 0.001)  # 0.1% corrosion
+from Entity import Entity
+from enum import Enum
+from Colors import COLORS
+
+
+class PartSize(Enum):
+    SMALL = {"boost": 0.03, "energy": 0.01, "color": COLORS["spare_part_small"]}
+    MEDIUM = {"boost": 0.05, "energy": 0.02, "color": COLORS["spare_part_medium"]}
+    LARGE = {"boost": 0.07, "energy": 0.03, "color": COLORS["spare_part_large"]}
+
+
+PART_SIZES = list(PartSize)       # size code -> PartSize (codes are positions in this list)
+
+# per-size constants, for hot code that would otherwise go through PartSize.value
+PART_BOOST = {size: size.value["boost"] for size in PartSize}
+PART_ENERGY = {size: size.value["energy"] for size in PartSize}
+PART_COLOR = {size: size.value["color"] for size in PartSize}
+PART_MATERIAL = {PartSize.SMALL: 1, PartSize.MEDIUM: 2, PartSize.LARGE: 3}   # what a swarm gains by consuming one
+
+CORROSION = 0.001   # enhancement lost per corrosion tick (0.1%)
+
+
+class CorrosionClock:
+    """ corrosion ticks so far; parts lying on a grid lose CORROSION per tick of the grid's clock """
+    __slots__ = ("ticks",)
+
+    def __init__(self):
+        self.ticks = 0
+
+    def tick(self, count: int = 1) -> None:
+        self.ticks += count
+
+
+class SparePart(Entity):
+    __slots__ = ("size", "clock", "_value", "_since")
+
+    def __init__(self, x: int, y: int, size: PartSize):
+        super().__init__(x, y)
+        self.size = size
+        self.clock = None               # CorrosionClock while the part lies on the grid (set by the grid)
+        self._value = PART_BOOST[size]
+        self._since = 0                 # clock ticks when _value was last brought up to date
+
+    @property
+    def enhancement_value(self) -> float:
+        """ corroded lazily: nothing is updated per step, the ticks since the part was last touched are applied on read """
+        if self.clock is None:
+            return self._value
+        return max(0, self._value - CORROSION * (self.clock.ticks - self._since))
+
+    @enhancement_value.setter
+    def enhancement_value(self, value: float) -> None:
+        self._value = value
+        self._since = self.clock.ticks if self.clock is not None else 0
+
+    def set_clock(self, clock) -> None:
+        """ start corroding with `clock` (or stop, with None), keeping the value so far """
+        value = self.enhancement_value
+        self.clock = clock
+        self.enhancement_value = value
+
+    def corrode(self):
+        self.enhancement_value = max(0, self.enhancement_value - CORROSION)  # 0.1% corrosion
@@ -0,0 +1,87 @@
+from typing import Dict, List, Tuple, Type
+from BucketIndex import BucketIndex
+
+
+class SpatialIndex:
+    """
+    Cell-keyed occupancy index for the entities on a TechburgGrid
+
+    every entity added here keeps a reference to the index (`entity.index`)
+    so that moving it through `Entity._set_position` keeps the cell map
+    up to date. Lookups of "what is on this cell" are O(1).
+
+    entity types registered with `track` are also kept in a BucketIndex
+    for nearest-neighbour queries.
+    """
+
+    def __init__(self):
+        self.cells: Dict[Tuple[int, int], List] = {}
+        self.trackers: Dict[Type, BucketIndex] = {}
+
+    def track(self, kind: Type, bucket_index: BucketIndex) -> None:
+        """keep every entity of exactly this type in `bucket_index` as well"""
+        self.trackers[kind] = bucket_index
+
+    def add(self, entity) -> None:
+        """start tracking an entity at its current position"""
+        self.cells.setdefault((entity.x, entity.y), []).append(entity)
+        entity.index = self
+        tracker = self.trackers.get(type(entity))
+        if tracker is not None:
+            tracker.add(entity)
+
+    def remove(self, entity) -> None:
+        """stop tracking an entity (picked up, consumed, merged or culled)"""
+        if entity.index is not self:
+            return
+        self._discard(entity, entity.x, entity.y)
+        entity.index = None
+        tracker = self.trackers.get(type(entity))
+        if tracker is not None:
+            tracker.remove(entity)
+
+    def move(self, entity, new_x: int, new_y: int) -> None:
+        """move a tracked entity to a new cell"""
+        if (new_x, new_y) != (entity.x, entity.y):
+            self._discard(entity, entity.x, entity.y)
+            self.cells.setdefault((new_x, new_y), []).append(entity)
+            tracker = self.trackers.get(type(entity))
+            if tracker is not None:
+                tracker.move(entity, new_x, new_y)
+        entity.x = new_x
+        entity.y = new_y
+
+    def at(self, x: int, y: int, kind: Type = None) -> List:
+        """ returns the entities on a cell, optionally only those of the given type """
+        entities = self.cells.get((x, y))
+        if not entities:
+            return []
+        if kind is None:
+            return list(entities)
+        return [entity for entity in entities if isinstance(entity, kind)]
+
+    def has(self, x: int, y: int, kinds: Tuple[Type, ...]) -> bool:
+        """ checks if a cell holds at least one entity of the given types """
+        entities = self.cells.get((x, y))
+        if not entities:
+            return False
+        return any(isinstance(entity, kinds) for entity in entities)
+
+    def clear(self) -> None:
+        for entities in self.cells.values():
+            for entity in entities:
+                entity.index = None
+        self.cells = {}
+        for tracker in self.trackers.values():
+            tracker.clear()
+
+    def _discard(self, entity, x: int, y: int) -> None:
+        entities = self.cells.get((x, y))
+        if entities is None:
+            return
+        for i, other in enumerate(entities):
+            if other is entity:
+                del entities[i]
+                break
+        if not entities:
+            del self.cells[(x, y)]
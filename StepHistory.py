@@ -0,0 +1,147 @@
+from collections import deque
+from sys import getsizeof
+from typing import Deque, Dict, Optional
+
+from FrameSnapshot import entity_key
+from SimulationState import RECORDS, SimulationState
+
+
+class HistoryEntry:
+    __slots__ = ("step_count", "keyframe", "data", "nbytes")
+
+    def __init__(self, step_count: int, keyframe: bool, data: dict, nbytes: int):
+        self.step_count = step_count
+        self.keyframe = keyframe
+        # keyframe: name -> {key: record}
+        # delta:    name -> (removed keys, {key: new or changed record}, key order or None)
+        self.data = data
+        self.nbytes = nbytes
+
+
+class StepHistory:
+    """
+    Undo/redo timeline of grid states, stored as deltas against the previous step
+
+    - every `keyframe_interval` steps (and after every restore, since restored
+      entities are new objects with new keys) a full keyframe is stored;
+      in between only the records of entities that appeared, disappeared or
+      changed are kept
+    - the timeline is a deque bounded by `budget_bytes`: the oldest keyframe and
+      its deltas are dropped together once the estimate goes over budget
+    - `cursor` is the entry the live grid is at; recording a step after
+      stepping back drops the entries after it, like any undo history
+    """
+
+    def __init__(self, budget_bytes: int = 64 * 2 ** 20, keyframe_interval: int = 50):
+        self.budget_bytes = budget_bytes
+        self.keyframe_interval = keyframe_interval
+        self.entries: Deque[HistoryEntry] = deque()
+        self.cursor = -1
+        self.nbytes = 0
+        # records of the last recorded state, keyed like the live grid; None forces a keyframe
+        self.last: Optional[Dict[str, dict]] = None
+        self.since_keyframe = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.cursor = -1
+        self.nbytes = 0
+        self.last = None
+
+    def can_step_back(self) -> bool:
+        return self.cursor > 0
+
+    def can_step_forward(self) -> bool:
+        return self.cursor < len(self.entries) - 1
+
+    def record(self, grid, step_count: int) -> None:
+        """ add the grid's current state as the newest entry (and move the cursor to it) """
+        while len(self.entries) > self.cursor + 1:
+            self.nbytes -= self.entries.pop().nbytes
+
+        current = {name: {entity_key(entity): record(entity) for entity in getattr(grid, name)}
+                   for name, record in RECORDS.items()}
+        if self.last is None or self.since_keyframe >= self.keyframe_interval:
+            entry = HistoryEntry(step_count, True, current, sum(self._records_bytes(records)
+                                                                for records in current.values()))
+            self.since_keyframe = 0
+        else:
+            data = {name: self._delta(self.last[name], current[name]) for name in RECORDS}
+            entry = HistoryEntry(step_count, False, data, sum(self._delta_bytes(delta) for delta in data.values()))
+        self.since_keyframe += 1
+
+        self.entries.append(entry)
+        self.nbytes += entry.nbytes
+        self.cursor = len(self.entries) - 1
+        self.last = current
+        self._evict()
+
+    def restored(self) -> None:
+        """ the grid was rebuilt from a state; its entities have new keys, so the next entry is a keyframe """
+        self.last = None
+
+    def step_back(self) -> SimulationState:
+        self.cursor -= 1
+        return self.state_at(self.cursor)
+
+    def step_forward(self) -> SimulationState:
+        self.cursor += 1
+        return self.state_at(self.cursor)
+
+    def state_at(self, index: int) -> SimulationState:
+        """ rebuild entry `index` from the keyframe before it and the deltas in between """
+        entries = self.entries
+        start = index
+        while not entries[start].keyframe:
+            start -= 1
+        state = {name: dict(records) for name, records in entries[start].data.items()}
+        for i in range(start + 1, index + 1):
+            for name, (removed, changed, order) in entries[i].data.items():
+                records = state[name]
+                for key in removed:
+                    del records[key]
+                records.update(changed)
+                if order is not None:
+                    state[name] = {key: records[key] for key in order}
+        return SimulationState.from_records({name: records.values() for name, records in state.items()},
+                                            entries[index].step_count)
+
+    # -------------------------------------------------------------- internals
+
+    @staticmethod
+    def _delta(previous: dict, current: dict) -> tuple:
+        removed = tuple(key for key in previous if key not in current)
+        changed = {key: record for key, record in current.items() if previous.get(key) != record}
+        # applying the delta keeps survivors in their old order and appends new keys; if
+        # that isn't the grid's order (an id was reused by a new entity) the order is stored too
+        expected = [key for key in previous if key in current]
+        expected.extend(key for key in current if key not in previous)
+        order = None if expected == list(current) else tuple(current)
+        return (removed, changed, order)
+
+    @staticmethod
+    def _records_bytes(records: dict) -> int:
+        """ rough footprint: the dict plus each record tuple and its fields """
+        return getsizeof(records) + sum(getsizeof(record) + sum(map(getsizeof, record))
+                                        for record in records.values())
+
+    @classmethod
+    def _delta_bytes(cls, delta: tuple) -> int:
+        removed, changed, order = delta
+        return getsizeof(removed) + cls._records_bytes(changed) + (getsizeof(order) if order is not None else 0)
+
+    def _evict(self) -> None:
+        """ drop whole keyframe groups from the old end while over budget, never the cursor's group """
+        entries = self.entries
+        while self.nbytes > self.budget_bytes:
+            end = 1
+            while end < len(entries) and not entries[end].keyframe:
+                end += 1
+            if end > self.cursor:
+                break
+            for _ in range(end):
+                self.nbytes -= entries.popleft().nbytes
+            self.cursor -= end
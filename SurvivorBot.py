@@ -1,105 +1,155 @@
-from typing import Optional
-from Entity import Entity
-from SparePart import SparePart
-from RechargeStation import RechargeStation
-
-
-
-class SurvivorBot(Entity):
-    def __init__(self, x: int, y: int):
-        super().__init__(x, y)
-        self.energy = 100.0
-        self.carried_part: Optional[SparePart] = None
-        self.target_part = None
-        self.target_station = None
-        self.movement_energy_cost = 5.0
-        self.critical_energy_threshold = 5.0
-
-        self.energy_enhancement = 0.0
-        self.base_max_energy = 100.0
-        self.max_energy = self.base_max_energy
-
-        self.resting = False
-        self.rest_energy_threshold = 60.0 # Start resting if energy below 50%
-        self.regen_rate = 1.0            # 1% regeneration per step
-        self.rest_energy_target = 0.0
-
-    def needs_rest(self) -> bool:
-        """Check if bot needs to rest (energy < 50%)"""
-        return self.energy < self.rest_energy_threshold
-
-    def has_enough_energy_for_move(self) -> bool:
-        """Check if bot has enough energy for movement"""
-        return self.energy >= self.movement_energy_cost
-
-    def is_critical_energy(self) -> bool:
-        """Check if bot is in critical energy state"""
-        return self.energy <= self.critical_energy_threshold
-
-    def start_resting(self) -> None:
-        """Start resting and set target energy level"""
-        self.resting = True
-        self.rest_energy_target = self.rest_energy_threshold
-
-    def rest_at_station(self) -> bool:
-        """
-        Regenerate energy while resting at station
-        Returns True if target energy is reached
-        """
-        if self.energy < self.rest_energy_target:
-            self.energy = min(self.rest_energy_threshold, self.energy + self.regen_rate)
-            return False
-        self.resting = False
-        return True
-
-    def reduce_energy(self, amount: float) -> None:
-        """Safely reduce bot's energy ensuring it doesn't go below 0"""
-        self.energy = max(0.0, self.energy - amount)
-
-
-    def recharge(self, amount: float) -> None:
-        """Safely recharge bot's energy"""
-        self.energy = min(self.max_energy, self.energy + amount)
-
-    def store_part_at_station(self, station: RechargeStation) -> bool:
-        """Attempt to store carried part at station"""
-        if self.carried_part and station.can_store_part():
-            station.store_part(self.carried_part)
-            self.carried_part = None
-            return True
-        return False
-
-    def move(self, new_x: int, new_y: int, grid_size: int):
-        """ implements wrapping around edges """
-        if self.has_enough_energy_for_move():
-            self.x = new_x % grid_size
-            self.y = new_y % grid_size
-            # self.energy -= 5.0  # 5% energy loss per movement
-            self.reduce_energy(self.movement_energy_cost)
-
-    def pickup_part(self, part: SparePart) -> bool:
-        """ picks up part from grid when bot is not carrying any part """
-        if self.carried_part is None:
-            self.carried_part = part
-            return True
-        return False
-
-    def deposit_part(self, station: RechargeStation):
-        """ deposits the gathered part from grid to recharge station """
-        if self.carried_part:
-            station.store_part(self.carried_part)
-            self.carried_part = None
-
-    def drop_part(self) -> None:
-        """ drops the currently carried part """
-        if self.carried_part:
-            # update part position to bot's current position
-            self.carried_part.x = self.x
-            self.carried_part.y = self.y
-            dropped_part = self.carried_part
-            self.carried_part = None
-            self.target_part = dropped_part
-            return dropped_part
-        return None
-
-
+import math
+from typing import Optional
+from Entity import Entity
+from SparePart import SparePart
+from RechargeStation import RechargeStation
+
+
+
+class SurvivorBot(Entity):
+    __slots__ = ("_energy", "carried_part", "dropped_part", "target_part", "target_station",
+                 "energy_enhancement", "max_energy", "resting", "rest_energy_target",
+                 "order", "clock", "parked_step", "wake_step")
+
+    movement_energy_cost = 5.0
+    critical_energy_threshold = 5.0
+    base_max_energy = 100.0
+    rest_energy_threshold = 60.0 # Start resting if energy below 50%
+    regen_rate = 1.0            # 1% regeneration per step
+
+    def __init__(self, x: int, y: int):
+        super().__init__(x, y)
+        self.order = 0              # position in the grid's update order (set by the grid)
+        self.clock = None           # while parked: the grid, whose station_step drives the rest (see park)
+        self.parked_step = 0
+        self.wake_step: Optional[int] = None
+        self._energy = 100.0
+        self.carried_part: Optional[SparePart] = None
+        self.dropped_part: Optional[SparePart] = None   # part knocked loose by a drone, picked up by the grid
+        self.target_part = None
+        self.target_station = None
+
+        self.energy_enhancement = 0.0
+        self.max_energy = self.base_max_energy
+
+        self.resting = False
+        self.rest_energy_target = 0.0
+
+    @property
+    def energy(self) -> float:
+        """ while parked the rest isn't stepped, it's worked out from the steps since parking """
+        if self.clock is None:
+            return self._energy
+        steps = max(0, self.clock.station_step - self.parked_step)
+        return min(self.rest_energy_threshold, self._energy + self.regen_rate * steps)
+
+    @energy.setter
+    def energy(self, value: float) -> None:
+        if self.clock is not None:
+            self.clock.wake_bot(self)     # drained or attacked while parked: the rest is interrupted
+        self._energy = value
+
+    def park(self, clock, step: int) -> Optional[int]:
+        """
+        stop updating a bot resting at its station after its update in `step`; returns
+        the step whose update ends the rest, or None if it never ends by itself
+        - until then resting is pure regeneration, so energy is derived from
+          clock.station_step (the last step whose station update has run) instead
+        - a rest only ends below rest_energy_threshold, so one aiming for it
+          (start_resting) lasts until something interrupts it (see TechburgGrid.wake_bot)
+        """
+        self.clock = clock
+        self.parked_step = step
+        steps = max(0, math.ceil((self.rest_energy_target - self._energy) / self.regen_rate))
+        if self._energy + self.regen_rate * steps >= self.rest_energy_threshold:
+            self.wake_step = None
+        else:
+            self.wake_step = step + 1 + steps
+        return self.wake_step
+
+    def wake(self) -> None:
+        """ update the bot again from now on, with the charge it has regained """
+        self._energy = self.energy
+        self.clock = None
+
+    def needs_rest(self) -> bool:
+        """Check if bot needs to rest (energy < 50%)"""
+        return self.energy < self.rest_energy_threshold
+
+    def has_enough_energy_for_move(self) -> bool:
+        """Check if bot has enough energy for movement"""
+        return self.energy >= self.movement_energy_cost
+
+    def is_critical_energy(self) -> bool:
+        """Check if bot is in critical energy state"""
+        return self.energy <= self.critical_energy_threshold
+
+    def start_resting(self) -> None:
+        """Start resting and set target energy level"""
+        self.resting = True
+        self.rest_energy_target = self.rest_energy_threshold
+
+    def rest_at_station(self) -> bool:
+        """
+        Regenerate energy while resting at station
+        Returns True if target energy is reached
+        """
+        if self.energy < self.rest_energy_target:
+            self.energy = min(self.rest_energy_threshold, self.energy + self.regen_rate)
+            return False
+        self.resting = False
+        return True
+
+    def reduce_energy(self, amount: float) -> None:
+        """Safely reduce bot's energy ensuring it doesn't go below 0"""
+        self.energy = max(0.0, self.energy - amount)
+
+
+    def recharge(self, amount: float) -> None:
+        """Safely recharge bot's energy"""
+        self.energy = min(self.max_energy, self.energy + amount)
+
+    def store_part_at_station(self, station: RechargeStation) -> bool:
+        """Attempt to store carried part at station"""
+        if self.carried_part and station.can_store_part():
+            station.store_part(self.carried_part)
+            self.carried_part = None
+            return True
+        return False
+
+    def move(self, new_x: int, new_y: int, grid_size: int):
+        """ implements wrapping around edges """
+        if self.has_enough_energy_for_move():
+            self._set_position(new_x % grid_size, new_y % grid_size)
+            # self.energy -= 5.0  # 5% energy loss per movement
+            self.reduce_energy(self.movement_energy_cost)
+
+    def pickup_part(self, part: SparePart) -> bool:
+        """ picks up part from grid when bot is not carrying any part """
+        if self.carried_part is None:
+            self.carried_part = part
+            self._emit("pickup", size=part.size.name)
+            return True
+        return False
+
+    def deposit_part(self, station: RechargeStation):
+        """ deposits the gathered part from grid to recharge station, a full station loses it """
+        if self.carried_part:
+            if station.store_part(self.carried_part):
+                self._emit("deposit", size=self.carried_part.size.name)
+            self.carried_part = None
+
+    def drop_part(self) -> None:
+        """ drops the currently carried part """
+        if self.carried_part:
+            # update part position to bot's current position
+            self.carried_part.x = self.x
+            self.carried_part.y = self.y
+            dropped_part = self.carried_part
+            self.carried_part = None
+            self.target_part = dropped_part
+            self.dropped_part = dropped_part
+            return dropped_part
+        return None
+
+
@@ -1,425 +1,806 @@
-from typing import List, Tuple, Optional
-from SurvivorBot import SurvivorBot
-from SparePart import SparePart, PartSize
-from RechargeStation import RechargeStation
-import random
-from Colors import COLORS
-
-from Drone import Drone
-from ScavengerSwarm import ScavengerSwarm
-
-
-
-class TechburgGrid:
-    def __init__(self, size: int):
-        self.size = size
-        self.stations: List[RechargeStation] = []
-        self.bots: List[SurvivorBot] = []
-        self.parts: List[SparePart] = []
-        self.drones = []
-        self.swarms = []
-
-    def initialize_simulation(self, num_stations: int, 
-                            num_bots: int, 
-                            num_parts: int, 
-                            num_swarms: int,
-                            num_drones: int = 2
-                            ):
-        """
-        This initializes the simulation grid by
-        - placing recharge stations in the grid at random places 
-        - placing survivor bots in the grid at random places
-        - placing the spare parts randomly
-        - placing the drones in the grid
-        """
-
-        # recharge stations
-        # for _ in range(num_stations):
-        #     x, y = self._get_random_empty_position()
-        #     self.stations.append(RechargeStation(x, y))
-
-        station_spacing = self.size // num_stations
-        for i in range(num_stations):
-            x = i * station_spacing + station_spacing // 2  # Evenly space stations
-            y = self.size - 1  # Last row
-            self.stations.append(RechargeStation(x, y))
-
-
-        # survivor bots
-        for _ in range(num_bots):
-            x, y = self._get_random_empty_position()
-            self.bots.append(SurvivorBot(x, y))
-
-        # spare parts
-        for _ in range(num_parts):
-            x, y = self._get_random_empty_position()
-            size = random.choice(list(PartSize))
-            self.parts.append(SparePart(x, y, size))
-
-        # drones
-        for _ in range(num_drones):
-            x, y = self._get_random_empty_position()
-            self.drones.append(Drone(x, y))
-
-        # swarms
-        for _ in range(num_swarms):
-            x, y = self._get_random_empty_position()
-            self.swarms.append(ScavengerSwarm(x, y))
-
-
-
-    def _get_random_empty_position(self) -> Tuple[int, int]:
-        """ returns two random values x and y between 0 and {size} representing the coordinates in grid"""
-        while True:
-            x = random.randint(0, self.size - 1)
-            y = random.randint(0, self.size - 1)
-            if self._is_position_empty(x, y):
-                return x, y
-
-    def _is_position_empty(self, x: int, y: int) -> bool:
-        """ checks if provided coordinats have anything or not """
-        for entity in self.stations + self.bots + self.parts:
-            if entity.x == x and entity.y == y:
-                return False
-        return True
-
-    def clear_entities(self):
-        """ clear all entities from the grid """
-        self.stations = []
-        self.bots = []
-        self.parts = []
-        self.drones = []
-        self.swarms = []
-
-
-    def simulate_step(self):
-        # Handle recharging at stations first
-        for station in self.stations:
-
-            # Check for drones at station
-            drones_at_station = [drone for drone in self.drones 
-                               if drone.x == station.x and drone.y == station.y]
-
-            # Find all bots at this station
-            bots_at_station = [bot for bot in self.bots 
-                            if bot.x == station.x and bot.y == station.y]
-            
-            for bot in bots_at_station:
-                # If drone present, bot should move to safety
-                if drones_at_station:
-                    # Find safe adjacent position
-                    safe_pos = self._find_safe_position(bot.x, bot.y)
-                    if safe_pos:
-                        bot.move(safe_pos[0], safe_pos[1], self.size)
-                    continue
-
-                if bot.carried_part and station.can_store_part():  # Max 5 parts per station
-                        bot.deposit_part(station)
-                        
-                # Critical energy case (≤ 5%) - consume parts immediately
-                if bot.is_critical_energy() and station.stored_parts:
-                    part = station.get_smallest_part()
-                    if part:
-                        energy_restore = part.size.value["energy"] * 100
-                        bot.recharge(energy_restore)
-                        station.stored_parts.remove(part)
-                    
-                # Regular recharge (1% per step) when not critical
-                elif bot.needs_rest():
-                    if not bot.resting:
-                        bot.start_resting()
-                    if bot.rest_at_station():  # If True, bot has finished resting
-                        # Move away from station after resting
-                        safe_pos = self._find_safe_position(bot.x, bot.y)
-                        if safe_pos:
-                            bot.move(safe_pos[0], safe_pos[1], self.size)
-                
-        # swarm decay field 
-        for swarm in self.swarms:
-            # Move swarm
-            swarm.update(self.size, self.parts, self.bots, self.drones, self.swarms)
-
-            for bot in self.bots:
-                if bot.energy > 0:  # Only affect active bots
-                    # Check if bot is within decay range (1 cell)
-                    dx = min(abs(swarm.x - bot.x), self.size - abs(swarm.x - bot.x))
-                    dy = min(abs(swarm.y - bot.y), self.size - abs(swarm.y - bot.y))
-                    if max(dx, dy) <= 1:  # Within 1 cell range
-                        bot.reduce_energy(3.0)  # 3% energy loss per step
-
-            # Apply decay to drones too
-            for drone in self.drones:
-                if not drone.is_hibernating:  # Only affect active drones
-                    dx = min(abs(swarm.x - drone.x), self.size - abs(swarm.x - drone.x))
-                    dy = min(abs(swarm.y - drone.y), self.size - abs(swarm.y - drone.y))
-                    if max(dx, dy) <= 1:
-                        drone.energy = max(0, drone.energy - 3.0)  # 3% energy loss per step
-
-            # Check for swarm merging
-            for other_swarm in self.swarms:
-                if swarm != other_swarm:
-                    dx = min(abs(swarm.x - other_swarm.x), self.size - abs(swarm.x - other_swarm.x))
-                    dy = min(abs(swarm.y - other_swarm.y), self.size - abs(swarm.y - other_swarm.y))
-                    if max(dx, dy) <= 1:  # Adjacent swarms
-                        # Merge swarms
-                        swarm.size += other_swarm.size
-                        swarm.consumed_material += other_swarm.consumed_material
-                        self.swarms.remove(other_swarm)
-                        break  # Only merge with one swarm per step
-
-            # Check for replication
-            if swarm.consumed_material >= swarm.replication_threshold:
-                # Create new swarm in adjacent cell
-                x = (swarm.x + random.randint(-1, 1)) % self.size
-                y = (swarm.y + random.randint(-1, 1)) % self.size
-                if self._is_position_empty(x, y):
-                    new_swarm = ScavengerSwarm(x, y)
-                    self.swarms.append(new_swarm)
-                    swarm.consumed_material -= swarm.replication_threshold
-
-        # Remove inactive bots that have been at 0 energy for too long
-        self.bots = [bot for bot in self.bots if bot.energy > 0]
-
-        # updates drones
-        for drone in self.drones:
-            drone.update(self.size, self.bots)
-            
-
-
-        for bot in self.bots:
-            if hasattr(bot, 'dropped_part') and bot.dropped_part:
-                if bot.dropped_part not in self.parts:
-                    self.parts.append(bot.dropped_part)
-                bot.dropped_part = None
-
-            if bot.resting or bot.energy <= 0:
-                continue
-
-            # Find nearest part if not carrying one
-            if not bot.carried_part:
-                nearest_part = self._find_nearest_part(bot)
-                if nearest_part:
-                    self._move_towards(bot, nearest_part.x, nearest_part.y)
-                    if bot.x == nearest_part.x and bot.y == nearest_part.y:
-                        bot.pickup_part(nearest_part)
-                        self.parts.remove(nearest_part)
-            # If carrying a part, find nearest station
-            else:
-                nearest_station = self._find_nearest_station(bot)
-                if nearest_station:
-                    self._move_towards(bot, nearest_station.x, nearest_station.y)
-                    if bot.x == nearest_station.x and bot.y == nearest_station.y:
-                        bot.deposit_part(nearest_station)
-
-            # Corrode parts
-            for part in self.parts:
-                part.corrode()
-
-
-    def _find_safe_position(self, x: int, y: int) -> Optional[Tuple[int, int]]:
-        """Find a safe position adjacent to the given coordinates"""
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-        random.shuffle(directions)  # Randomize direction choices
-        
-        for dx, dy in directions:
-            new_x = (x + dx) % self.size
-            new_y = (y + dy) % self.size
-            
-            # Check if position is safe (no drones nearby)
-            if not any(self._is_drone_nearby(new_x, new_y, drone) 
-                      for drone in self.drones):
-                return (new_x, new_y)
-        return None
-
-    def _is_drone_nearby(self, x: int, y: int, drone: Drone) -> bool:
-        """Check if a drone is within one cell of the given position"""
-        dx = min(abs(x - drone.x), self.size - abs(x - drone.x))
-        dy = min(abs(y - drone.y), self.size - abs(y - drone.y))
-        return max(dx, dy) <= 1
-    
-
-    def _find_nearest_part(self, bot: SurvivorBot) -> Optional[SparePart]:
-        return min(self.parts, key=lambda p: self._calculate_distance(bot.x, bot.y, p.x, p.y), default=None)
-
-    def _find_nearest_station(self, bot: SurvivorBot) -> Optional[RechargeStation]:
-        return min(self.stations, key=lambda s: self._calculate_distance(bot.x, bot.y, s.x, s.y), default=None)
-
-    def _calculate_distance(self, x1: int, y1: int, x2: int, y2: int) -> float:
-        dx = min(abs(x2 - x1), self.size - abs(x2 - x1))
-        dy = min(abs(y2 - y1), self.size - abs(y2 - y1))
-        return (dx ** 2 + dy ** 2) ** 0.5
-
-    def _move_towards(self, bot: SurvivorBot, target_x: int, target_y: int):
-
-        if bot.energy <= 0:
-            return  # Don't move if no energy
-
-        dx = (target_x - bot.x + self.size // 2) % self.size - self.size // 2
-        dy = (target_y - bot.y + self.size // 2) % self.size - self.size // 2
-        
-        if abs(dx) > abs(dy):
-            new_x = bot.x + (1 if dx > 0 else -1)
-            if bot.has_enough_energy_for_move():
-                bot.move(new_x, bot.y, self.size)
-        else:
-            new_y = bot.y + (1 if dy > 0 else -1)
-            if bot.has_enough_energy_for_move():
-                bot.move(bot.x, new_y, self.size)
-
-    def restore_from_state(self, state):
-        """ restore grid state from saved state (type: SimulationState) """
-
-        # restore stations
-        for x, y, stored_parts_data in state.stations:
-            station = RechargeStation(x, y)
-            # Recreate stored parts
-            for part_data in stored_parts_data:
-                part = SparePart(part_data.x, part_data.y, part_data.size)
-                station.stored_parts.append(part)
-            self.stations.append(station)
-
-        # restore bots
-        for x, y, energy, carried_part_data in state.bots:
-            bot = SurvivorBot(x, y)
-            bot.energy = energy
-            if carried_part_data:
-                # recreate carried part if it exists
-                carried_part = SparePart(carried_part_data.x, carried_part_data.y, carried_part_data.size)
-                bot.carried_part = carried_part
-            self.bots.append(bot)
-
-        # restore parts
-        for x, y, size in state.parts:
-            # convert size string to PartSize enum if needed
-            if isinstance(size, str):
-                size = PartSize[size.upper()]
-            part = SparePart(x, y, size)
-            self.parts.append(part)
-
-        # restore drones
-        for x, y, energy, is_hibernating in state.drones:
-            drone = Drone(x, y)
-            drone.energy = energy
-            drone.is_hibernating = is_hibernating
-            self.drones.append(drone)
-
-        # restore swarms
-        for x, y, size, consumed_material in state.swarms:
-            swarm = ScavengerSwarm(x, y)
-            swarm.size = size
-            swarm.consumed_material = consumed_material
-            self.swarms.append(swarm)
-
-    def display_tkinter(self, canvas):
-        """Display the current state of the grid using Tkinter"""
-        canvas.delete("all")  # clear previous frame
-        cell_size = min(1000 // self.size, 1000 // self.size)  # calculate cell size
-        
-        # empty grid
-        for i in range(self.size + 1):
-            canvas.create_line(i * cell_size, 0, i * cell_size, self.size * cell_size)
-            canvas.create_line(0, i * cell_size, self.size * cell_size, i * cell_size)
-
-        # parts with size-based colors
-        for part in self.parts:
-            x = part.x * cell_size
-            y = part.y * cell_size
-            color = part.size.value["color"]
-            canvas.create_oval(x+4, y+4, x+cell_size-4, y+cell_size-4, 
-                             fill=color,
-                             outline="black")
-            # size indicator for the spare parts
-            size_text = part.size.name[0]  # first letter of size (S/M/L) - (SMALL/MEDIUM/Large)
-            canvas.create_text(x + cell_size//2, y + cell_size//2, 
-                             text=size_text, fill="black")
-
-
-        # create stations in the grid
-        for station in self.stations:
-            x = station.x * cell_size
-            y = station.y * cell_size
-            canvas.create_rectangle(x+2, y+2, x+cell_size-2, y+cell_size-2, 
-                                  fill=COLORS["recharge_station"])
-            # Show number of stored parts
-            num_parts = len(station.stored_parts)
-            canvas.create_text(x + cell_size//2, y + cell_size//2, 
-                             text=str(num_parts), fill="white")
-
-        # create bots in the grid
-        for bot in self.bots:
-            x = bot.x * cell_size
-            y = bot.y * cell_size
-
-            # oval shaped bots
-            canvas.create_oval(x+2, y+2, x+cell_size-2, y+cell_size-2, 
-                             fill=COLORS["bot"])
-
-            # put the energy level on the bot
-            energy_text = f"{int(bot.energy)}%"
-            canvas.create_text(x + cell_size//2, y + cell_size//2, 
-                             text=energy_text, fill="white")
-            
-            # If bot is carrying a part, show indicator by putting orange colored border around the survivor bot
-            if bot.carried_part:
-                # thick highlighted border for bots carrying parts
-                # outer border (highlight)
-                border_width = 3
-                canvas.create_rectangle(x, y, x+cell_size, y+cell_size, 
-                                  outline="orange", width=border_width+1)
-
-                # inner bot rectangle
-                canvas.create_rectangle(x+2, y+2, x+cell_size-2, y+cell_size-2, 
-                                  fill=COLORS["bot"], outline="black", width=1)
-                
-            else:
-                # Normal bot without carried part
-                canvas.create_rectangle(x+2, y+2, x+cell_size-2, y+cell_size-2, 
-                                    fill=COLORS["bot"], outline="black", width=1)
-
-
-            canvas.create_text(x + cell_size//2, y + cell_size//2, 
-                            text=energy_text, fill="white", font=("Arial", max(8, cell_size//4)))
-
-
-        # draw drones to tkinter canvas
-        for drone in self.drones:
-            x = drone.x * cell_size
-            y = drone.y * cell_size
-            color = "purple" if drone.is_hibernating else "red"
-            
-            # drone
-            canvas.create_rectangle(x+2, y+2, x+cell_size-2, y+cell_size-2, 
-                                 fill=color, outline="black")
-            
-            # energy level for drone
-            energy_text = f"{int(drone.energy)}%"
-            canvas.create_text(x + cell_size//2, y + cell_size//2, 
-                             text=energy_text, fill="white", 
-                             font=('Arial', max(8, cell_size // 4)))
-
-        # draw swarms in grid
-        for swarm in self.swarms:
-            x = swarm.x * cell_size
-            y = swarm.y * cell_size
-            
-            # Draw swarm body
-            canvas.create_rectangle(x+2, y+2, x+cell_size-2, y+cell_size-2, 
-                                fill=COLORS["swarm"], outline="black")
-            
-            # Show swarm size
-            canvas.create_text(x + cell_size//2, y + cell_size//2, 
-                            text=str(swarm.size), fill="white", 
-                            font=('Arial', max(8, cell_size // 4)))
-
-            # Draw decay field indicator (semi-transparent circle)
-            decay_radius = cell_size * 1.5  # Visual indicator for 1-cell decay range
-            canvas.create_oval(x + cell_size//2 - decay_radius, 
-                            y + cell_size//2 - decay_radius,
-                            x + cell_size//2 + decay_radius, 
-                            y + cell_size//2 + decay_radius,
-                            fill='', outline=COLORS["swarm"], 
-                            stipple='gray50')  # Makes the circle semi-transparent
-
-
-        canvas.update()
-
+from typing import List, Tuple, Optional
+from SurvivorBot import SurvivorBot
+from SparePart import SparePart, PartSize, CorrosionClock, PART_ENERGY, PART_SIZES
+from RechargeStation import RechargeStation
+import heapq
+import random
+
+from Drone import Drone
+from ScavengerSwarm import ScavengerSwarm
+from SpatialIndex import SpatialIndex
+from BucketIndex import BucketIndex
+from Checkpoint import Checkpoint
+from EventLog import EventLog
+from MetricsSink import MetricsSink
+from PhaseProfiler import PhaseProfiler
+from UnionFind import UnionFind
+from WakeScheduler import WakeScheduler
+from EntityRegistry import EntityRegistry, EntityList
+from PopulationCounters import PopulationCounters
+from TkRenderer import TkRenderer
+from RasterRenderer import RasterRenderer
+
+
+
+class TechburgGrid:
+    ENGINES = ("object", "numpy")
+
+    def __init__(self, size: int, vectorized_decay: bool = False, engine: str = "object",
+                 seed: Optional[int] = None, per_bot_corrosion: bool = False):
+        """
+        engine:
+        - "object": every entity is a Python object (default)
+        - "numpy" : entities are stored in numpy arrays and stepped in batches (see ArrayEngine)
+
+        seed: seeds the grid's own RNG, which every drone and swarm draws from,
+        so worlds with the same seed replay identically and never share state
+
+        per_bot_corrosion: parts on the ground corrode 0.1% per step by default;
+        True keeps the old rate of 0.1% per active bot per step
+        """
+        if engine not in self.ENGINES:
+            raise ValueError(f"unknown engine {engine!r}, expected one of {self.ENGINES}")
+        if vectorized_decay or engine == "numpy":
+            # numpy is only loaded by the paths that use it, so object-engine runs start without it
+            from ArrayEngine import np
+            if np is None:
+                raise ImportError("vectorized_decay / engine='numpy' requires numpy")
+        self.size = size
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.vectorized_decay = vectorized_decay    # apply the swarm decay field with array stencils
+        self.per_bot_corrosion = per_bot_corrosion
+        self.corrosion = CorrosionClock()           # parts on the grid corrode by its ticks (see SparePart)
+        # hibernating drones are parked until they wake up; the rest are updated every step
+        self.scheduler = WakeScheduler()
+        self.awake_drones: List[Tuple[int, Drone]] = []     # (index in self.drones, drone), in list order
+        # so are bots resting at a station (see _park_bot); bots can leave the grid, so their
+        # update order is a counter instead of a list index
+        self.bot_scheduler = WakeScheduler()
+        self.awake_bots: List[Tuple[int, SurvivorBot]] = []     # (order, bot) of the bots not parked, in list order
+        self.woken_bots: List[Tuple[int, SurvivorBot]] = []     # bots woken since awake_bots was last updated
+        self.next_bot_order = 0
+        self.station_step = 0       # last step whose station update has run, the clock of parked bots
+        # every entity object gets a uid from the registry while it's in one of the lists
+        self.registry = EntityRegistry()
+        self.stations: EntityList = EntityList(self.registry)
+        self.bots: EntityList = EntityList(self.registry)
+        self.parts: EntityList = EntityList(self.registry)
+        self.drones: EntityList = EntityList(self.registry)
+        self.swarms: EntityList = EntityList(self.registry)
+        self.counters = PopulationCounters()    # totals for population() the lists can't give by length
+        self.index = SpatialIndex()     # cell -> entities on that cell
+        # nearest-neighbour lookups for foraging and delivering bots
+        self.part_index = BucketIndex(size, bucket_size=8)
+        self.station_index = BucketIndex(size, bucket_size=32)
+        self.index.track(SparePart, self.part_index)
+        self.index.track(RechargeStation, self.station_index)
+        # range queries for drones looking for bots and bots looking out for drones
+        self.bot_index = BucketIndex(size, bucket_size=8)
+        self.drone_index = BucketIndex(size, bucket_size=8)
+        self.index.track(SurvivorBot, self.bot_index)
+        self.index.track(Drone, self.drone_index)
+        # per-cell (nearest station, next step towards it); stations never move
+        # so each cell is resolved at most once per world
+        self.station_routes: List[Optional[Tuple[RechargeStation, int, int]]] = []
+        self._reset_station_routes()
+        self.engine = None                                # ArrayEngine with engine="numpy"
+        if engine == "numpy":
+            from ArrayEngine import ArrayEngine
+            self.engine = ArrayEngine(self)
+        self.profiler: Optional[PhaseProfiler] = None     # see enable_profiling
+        self.renderer = None                              # TkRenderer or RasterRenderer, created by display_tkinter
+        self.step_count = 0                               # steps simulated since the world was created
+        self.events: Optional[EventLog] = None            # see start_recording
+        self.metrics: Optional[MetricsSink] = None        # see start_metrics
+
+    def initialize_simulation(self, num_stations: int, 
+                            num_bots: int, 
+                            num_parts: int, 
+                            num_swarms: int,
+                            num_drones: int = 2
+                            ):
+        """
+        This initializes the simulation grid by
+        - placing recharge stations in the grid at random places 
+        - placing survivor bots in the grid at random places
+        - placing the spare parts randomly
+        - placing the drones in the grid
+        """
+
+        self._reset_station_routes()
+
+        # recharge stations
+        # for _ in range(num_stations):
+        #     x, y = self._get_random_empty_position()
+        #     self.stations.append(RechargeStation(x, y))
+
+        station_spacing = self.size // num_stations
+        for i in range(num_stations):
+            x = i * station_spacing + station_spacing // 2  # Evenly space stations
+            y = self.size - 1  # Last row
+            self._add_entity(self.stations, RechargeStation(x, y))
+
+
+        # survivor bots
+        for _ in range(num_bots):
+            x, y = self._get_random_empty_position()
+            self._add_entity(self.bots, SurvivorBot(x, y))
+
+        # spare parts
+        for _ in range(num_parts):
+            x, y = self._get_random_empty_position()
+            size = self.rng.choice(list(PartSize))
+            self._add_entity(self.parts, SparePart(x, y, size))
+
+        # drones
+        for _ in range(num_drones):
+            x, y = self._get_random_empty_position()
+            self._add_entity(self.drones, Drone(x, y, rng=self.rng))
+
+        # swarms
+        for _ in range(num_swarms):
+            x, y = self._get_random_empty_position()
+            self._add_entity(self.swarms, ScavengerSwarm(x, y, rng=self.rng))
+
+        if self.engine is not None:
+            self.engine.load()
+
+
+    def _get_random_empty_position(self) -> Tuple[int, int]:
+        """ returns two random values x and y between 0 and {size} representing the coordinates in grid"""
+        while True:
+            x = self.rng.randint(0, self.size - 1)
+            y = self.rng.randint(0, self.size - 1)
+            if self._is_position_empty(x, y):
+                return x, y
+
+    def _is_position_empty(self, x: int, y: int) -> bool:
+        """ checks if provided coordinats have a station, bot or part on them """
+        return not self.index.has(x, y, (RechargeStation, SurvivorBot, SparePart))
+
+    def _add_entity(self, entities: list, entity) -> None:
+        """ append an entity to one of the grid's lists and start tracking its cell """
+        entities.append(entity)
+        entity.events = self._event_target()
+        if entities is self.parts:
+            entity.set_clock(self.corrosion)    # only parts lying on the grid corrode
+        elif entities is self.drones:
+            # drones never leave the grid, so a drone's position in the list is its update order
+            self.awake_drones.append((len(entities) - 1, entity))
+            self.counters.hibernating_drones += entity.is_hibernating
+        elif entities is self.bots:
+            entity.order = self.next_bot_order
+            self.next_bot_order += 1
+            self.awake_bots.append((entity.order, entity))
+        elif entities is self.swarms:
+            self.counters.swarm_size += entity.size
+        elif entities is self.stations:
+            entity.counters = self.counters
+            self.counters.stored_parts += len(entity.stored_parts)
+        self.index.add(entity)
+
+    def _remove_entity(self, entities: list, entity) -> None:
+        """ remove an entity from one of the grid's lists and from the occupancy index """
+        entities.remove(entity)
+        if entities is self.parts:
+            entity.set_clock(None)
+        elif entities is self.swarms:
+            self.counters.swarm_size -= entity.size
+        self.index.remove(entity)
+
+    def clear_entities(self):
+        """ clear all entities from the grid """
+        self.registry.clear()
+        self.stations = EntityList(self.registry)
+        self.bots = EntityList(self.registry)
+        self.parts = EntityList(self.registry)
+        self.drones = EntityList(self.registry)
+        self.swarms = EntityList(self.registry)
+        self.counters = PopulationCounters()
+        self.index.clear()
+        self._reset_station_routes()
+        self.scheduler.clear()
+        self.awake_drones = []
+        self.bot_scheduler.clear()
+        self.awake_bots = []
+        self.woken_bots = []
+        self.next_bot_order = 0
+        self.step_count = 0
+        if self.engine is not None:
+            self.engine.clear()
+        if self.events is not None:
+            self.events.restored()
+
+
+    def enable_profiling(self, history: int = 100) -> PhaseProfiler:
+        """ start recording per-phase timings of simulate_step for the last `history` steps """
+        if self.profiler is None or self.profiler.history != history:
+            self.profiler = PhaseProfiler(history)
+        return self.profiler
+
+    def disable_profiling(self) -> None:
+        self.profiler = None
+
+    def start_recording(self, directory: str, keyframe_interval: int = 1000) -> EventLog:
+        """
+        log significant events of every following step, plus a keyframe every
+        `keyframe_interval` steps, to `directory` (see EventLog and Replay)
+        """
+        self.stop_recording()
+        self.events = EventLog(directory, self, keyframe_interval)
+        self._attach_events()
+        return self.events
+
+    def stop_recording(self) -> None:
+        if self.events is None:
+            return
+        self.events.close()
+        self.events = None
+        self._attach_events()
+
+    def start_metrics(self, path: str, sample_every: int = 1, downsample: int = 1,
+                      buffer_rows: int = 1000, format: Optional[str] = None) -> MetricsSink:
+        """ stream per-step metrics of every following step to a CSV or JSON-lines file (see MetricsSink) """
+        self.stop_metrics()
+        self.metrics = MetricsSink(path, self, sample_every, downsample, buffer_rows, format)
+        self._attach_events()
+        return self.metrics
+
+    def stop_metrics(self) -> None:
+        if self.metrics is None:
+            return
+        self.metrics.close()
+        self.metrics = None
+        self._attach_events()
+
+    def _event_target(self):
+        """ where events are reported: the metrics sink (which passes them on to the log), the log, or nowhere """
+        return self.metrics if self.metrics is not None else self.events
+
+    def _attach_events(self) -> None:
+        """ point every entity object at the current event target (the numpy engine reports for its own entities) """
+        if self.metrics is not None:
+            self.metrics.log = self.events
+        target = self._event_target()
+        lists = [self.stations]
+        if self.engine is None:
+            lists += [self.bots, self.parts, self.drones, self.swarms]
+        for entities in lists:
+            for entity in entities:
+                entity.events = target
+
+    def _emit(self, event: str, x: int, y: int, **fields) -> None:
+        target = self._event_target()
+        if target is not None:
+            target.emit(event, x, y, **fields)
+
+    def simulate_step(self):
+        events = self.events
+        if events is not None:
+            events.begin_step(self)
+        if self.engine is not None:
+            self.engine.step()
+        else:
+            self._step_objects()
+        self.step_count += 1
+        if events is not None:
+            events.end_step(self)
+        if self.metrics is not None:
+            self.metrics.end_step(self)
+
+    def _step_objects(self):
+        """ one step of the object engine """
+        profiler = self.profiler
+        if profiler is not None:
+            lap = profiler.now()
+
+        # bots whose rest is over are updated again from this step's station update on
+        step = self.step_count + 1
+        for _, bot in self.bot_scheduler.due(step):
+            if bot.clock is not None and bot.wake_step == step:    # else it was woken early
+                self.wake_bot(bot)
+
+        # Handle recharging at stations first
+        for station in self.stations:
+
+            # Check for drones at station
+            drones_at_station = self.index.has(station.x, station.y, (Drone,))
+
+            # Find all bots at this station
+            bots_at_station = self.index.at(station.x, station.y, SurvivorBot)
+            
+            for bot in bots_at_station:
+                if bot.clock is not None:
+                    # parked while resting: only a drone at the station changes anything here
+                    if not drones_at_station:
+                        continue
+                    self.wake_bot(bot)
+
+                # If drone present, bot should move to safety
+                if drones_at_station:
+                    # Find safe adjacent position
+                    safe_pos = self._find_safe_position(bot.x, bot.y)
+                    if safe_pos:
+                        bot.move(safe_pos[0], safe_pos[1], self.size)
+                    continue
+
+                if bot.carried_part and station.can_store_part():  # Max 5 parts per station
+                        bot.deposit_part(station)
+                        
+                # Critical energy case (≤ 5%) - consume parts immediately
+                if bot.is_critical_energy() and station.stored_parts:
+                    part = station.get_smallest_part()
+                    if part:
+                        energy_restore = PART_ENERGY[part.size] * 100
+                        bot.recharge(energy_restore)
+                        station.take_part(part)
+                    
+                # Regular recharge (1% per step) when not critical
+                elif bot.needs_rest():
+                    if not bot.resting:
+                        bot.start_resting()
+                    if bot.rest_at_station():  # If True, bot has finished resting
+                        # Move away from station after resting
+                        safe_pos = self._find_safe_position(bot.x, bot.y)
+                        if safe_pos:
+                            bot.move(safe_pos[0], safe_pos[1], self.size)
+
+                # from here on the rest only regenerates until it ends or is interrupted
+                if bot.resting and not bot.carried_part and not bot.is_critical_energy():
+                    self._park_bot(bot, step)
+        self.station_step = step
+
+        if profiler is not None:
+            lap = profiler.add("stations", lap)
+                
+        # swarm decay field 
+        decay_sources = []  # (x, y, decay range) of each swarm, for the vectorized pass
+        for swarm in self.swarms:
+            # Move swarm
+            if profiler is not None:
+                start = profiler.now()
+            count = len(self.swarms)
+            swarm.update(self.size, self.parts, self.bots, self.drones, self.swarms)
+            # a swarm that replicates appends its offspring (of size 1) to the list itself
+            self.counters.swarm_size += len(self.swarms) - count
+            if profiler is not None:
+                profiler.add("swarms/update", start)
+
+            if self.vectorized_decay:
+                decay_sources.append((swarm.x, swarm.y, swarm.decay_range))
+            else:
+                self._apply_swarm_decay(swarm)
+
+            # Check for replication
+            if swarm.consumed_material >= swarm.replication_threshold:
+                # Create new swarm in adjacent cell
+                x = (swarm.x + self.rng.randint(-1, 1)) % self.size
+                y = (swarm.y + self.rng.randint(-1, 1)) % self.size
+                if self._is_position_empty(x, y):
+                    new_swarm = ScavengerSwarm(x, y, rng=self.rng)
+                    self._add_entity(self.swarms, new_swarm)
+                    self._emit("replicate", x, y)
+                    swarm.consumed_material -= swarm.replication_threshold
+
+        # swarms on the same or adjacent cells merge, once all of them have moved
+        self._merge_swarms()
+
+        if decay_sources:
+            self._apply_decay_field(decay_sources)
+
+        if profiler is not None:
+            lap = profiler.add("swarms", lap)
+
+        # Remove inactive bots that have been at 0 energy for too long
+        # (parked bots only ever regain energy)
+        for bot in [bot for bot in self._update_awake_bots() if bot.energy <= 0]:
+            self._emit("death", bot.x, bot.y, cause="energy")
+            self._remove_entity(self.bots, bot)
+
+        if profiler is not None:
+            lap = profiler.add("cull", lap)
+
+        # updates drones
+        # a parked drone's update in its wake-up step only tops up its charge, so it
+        # happens here and the drone acts again from the next step on
+        counters = self.counters
+        woken = self.scheduler.due(step)
+        for _, drone in woken:
+            drone.wake()
+        counters.hibernating_drones -= len(woken)
+        awake = []
+        for order, drone in self.awake_drones:
+            if profiler is not None:
+                start = profiler.now()
+            was_hibernating = drone.is_hibernating
+            drone.update(self)
+            if profiler is not None:
+                profiler.add("drones/update", start)
+            counters.hibernating_drones += drone.is_hibernating - was_hibernating
+            if drone.is_hibernating:
+                self.scheduler.park(drone, drone.park(self, step), order)
+            else:
+                awake.append((order, drone))
+        self.awake_drones = list(heapq.merge(awake, woken, key=lambda item: item[0])) if woken else awake
+
+        if profiler is not None:
+            lap = profiler.add("drones", lap)
+
+
+        # parked bots are resting, which makes their update a no-op
+        for bot in self._update_awake_bots():
+            if bot.dropped_part:
+                if bot.dropped_part not in self.parts:
+                    self._add_entity(self.parts, bot.dropped_part)
+                bot.dropped_part = None
+
+            if bot.resting or bot.energy <= 0:
+                continue
+
+            # Find nearest part if not carrying one
+            if not bot.carried_part:
+                nearest_part = self._find_nearest_part(bot)
+                if nearest_part:
+                    self._move_towards(bot, nearest_part.x, nearest_part.y)
+                    if bot.x == nearest_part.x and bot.y == nearest_part.y:
+                        bot.pickup_part(nearest_part)
+                        self._remove_entity(self.parts, nearest_part)
+            # If carrying a part, find nearest station
+            else:
+                route = self._route_to_station(bot.x, bot.y)
+                if route:
+                    nearest_station, next_x, next_y = route
+                    bot.move(next_x, next_y, self.size)
+                    if bot.x == nearest_station.x and bot.y == nearest_station.y:
+                        bot.deposit_part(nearest_station)
+
+            # Corrode parts (lazily, see SparePart.enhancement_value)
+            if self.per_bot_corrosion:
+                self.corrosion.tick()
+
+        if not self.per_bot_corrosion:
+            self.corrosion.tick()
+        if profiler is not None:
+            profiler.add("bots", lap)
+            profiler.end_step()
+
+
+    def _park_bot(self, bot: SurvivorBot, step: int) -> None:
+        """ stop updating a resting bot after its station update in `step` (see SurvivorBot.park) """
+        wake_step = bot.park(self, step)
+        if wake_step is not None:
+            self.bot_scheduler.park(bot, wake_step, bot.order)
+
+    def wake_bot(self, bot: SurvivorBot) -> None:
+        """
+        update a parked bot again from now on: its rest is over, a drone came to
+        its station, or its energy was changed from outside (an attack, swarm decay)
+        """
+        bot.wake()
+        self.woken_bots.append((bot.order, bot))
+
+    def _update_awake_bots(self) -> List[SurvivorBot]:
+        """ merge woken bots into awake_bots, drop parked and departed ones and return the bots """
+        woken, self.woken_bots = self.woken_bots, []
+        entries = self.awake_bots
+        if woken:
+            woken.sort(key=lambda item: item[0])
+            entries = heapq.merge(entries, woken, key=lambda item: item[0])
+        awake = []
+        last = -1
+        for order, bot in entries:
+            # a bot parked and woken again within a step is in both lists; uids go when bots leave the grid
+            if order == last or bot.clock is not None or bot.uid is None:
+                continue
+            awake.append((order, bot))
+            last = order
+        self.awake_bots = awake
+        return [bot for _, bot in awake]
+
+    def _merge_swarms(self) -> None:
+        """
+        merge every cluster of swarms on the same or adjacent cells into its first member
+        - swarms are bucketed by cell and each one is joined with the first swarm
+          of every neighbouring cell, so clusters are found in one linear pass
+        - the merged swarms are removed in O(1) each
+        """
+        swarms = list(self.swarms)
+        if len(swarms) < 2:
+            return
+        first_at = {}   # cell -> index of the first swarm on it
+        for i, swarm in enumerate(swarms):
+            first_at.setdefault((swarm.x, swarm.y), i)
+
+        offsets = {(dx % self.size, dy % self.size) for dx in (-1, 0, 1) for dy in (-1, 0, 1)}
+        clusters = UnionFind(len(swarms))
+        for i, swarm in enumerate(swarms):
+            for dx, dy in offsets:
+                j = first_at.get(((swarm.x + dx) % self.size, (swarm.y + dy) % self.size))
+                if j is not None:
+                    clusters.union(i, j)
+
+        for i, swarm in enumerate(swarms):
+            root = clusters.find(i)
+            if root == i:
+                continue
+            first = swarms[root]
+            self._emit("merge", first.x, first.y, absorbed=swarm.size)
+            first.size += swarm.size
+            first.consumed_material += swarm.consumed_material
+            self._remove_entity(self.swarms, swarm)
+            self.counters.swarm_size += swarm.size  # the size moved to `first`, the total is unchanged
+
+    def _apply_swarm_decay(self, swarm: ScavengerSwarm) -> None:
+        """ drain 3% energy from every active bot and drone within 1 cell of the swarm """
+        # runs once per swarm over every bot and drone: keep lookups out of the loops
+        size, x, y = self.size, swarm.x, swarm.y
+        for bot in self.bots:
+            if bot.energy > 0:  # Only affect active bots
+                # Check if bot is within decay range (1 cell)
+                dx = abs(x - bot.x)
+                dy = abs(y - bot.y)
+                if min(dx, size - dx) <= 1 and min(dy, size - dy) <= 1:  # Within 1 cell range
+                    bot.reduce_energy(3.0)  # 3% energy loss per step
+
+        # Apply decay to drones too
+        for drone in self.drones:
+            if not drone.is_hibernating:  # Only affect active drones
+                dx = abs(x - drone.x)
+                dy = abs(y - drone.y)
+                if min(dx, size - dx) <= 1 and min(dy, size - dy) <= 1:
+                    drone.energy = max(0, drone.energy - 3.0)  # 3% energy loss per step
+
+    def _apply_decay_field(self, sources: List[Tuple[int, int, int]]) -> None:
+        """
+        Vectorized version of `_apply_swarm_decay` for all swarms of a step at once
+        - swarm positions are rasterized into a per-cell count
+        - a wrapped (2r+1)x(2r+1) box stencil turns that into "swarms in range" per cell
+        - bots and drones lose 3% per swarm in range, gathered in one lookup
+
+        the drain is applied after the whole swarm phase instead of swarm by swarm,
+        so a bot drained to 0 here is only consumed by a swarm on the next step
+        """
+        from ArrayEngine import np, wrapped_box_count
+        field = np.zeros((self.size, self.size), dtype=np.int32)
+        for decay_range in {source[2] for source in sources}:
+            xs = [x for x, _, r in sources if r == decay_range]
+            ys = [y for _, y, r in sources if r == decay_range]
+            field += wrapped_box_count(self.size, xs, ys, decay_range)
+
+        bots = list(self.bots)
+        if bots:
+            bot_x = np.fromiter((bot.x for bot in bots), dtype=np.intp, count=len(bots))
+            bot_y = np.fromiter((bot.y for bot in bots), dtype=np.intp, count=len(bots))
+            hits = field[bot_y, bot_x]
+            for i in np.flatnonzero(hits):
+                bot = bots[i]
+                if bot.energy > 0:  # Only affect active bots
+                    bot.reduce_energy(3.0 * int(hits[i]))
+
+        drones = list(self.drones)
+        if drones:
+            drone_x = np.fromiter((drone.x for drone in drones), dtype=np.intp, count=len(drones))
+            drone_y = np.fromiter((drone.y for drone in drones), dtype=np.intp, count=len(drones))
+            hits = field[drone_y, drone_x]
+            for i in np.flatnonzero(hits):
+                drone = drones[i]
+                if not drone.is_hibernating:  # Only affect active drones
+                    drone.energy = max(0, drone.energy - 3.0 * int(hits[i]))
+
+    def _find_safe_position(self, x: int, y: int) -> Optional[Tuple[int, int]]:
+        """Find a safe position adjacent to the given coordinates"""
+        directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        self.rng.shuffle(directions)  # Randomize direction choices
+        
+        for dx, dy in directions:
+            new_x = (x + dx) % self.size
+            new_y = (y + dy) % self.size
+            
+            # Check if position is safe (no drones nearby)
+            if not self.any_drone_in_range(new_x, new_y, 1):
+                return (new_x, new_y)
+        return None
+
+    def bots_in_range(self, x: int, y: int, radius: int) -> List[SurvivorBot]:
+        """ bots within `radius` cells of (x, y) (wrapped chebyshev distance), in list order """
+        return self.bot_index.within(x, y, radius)
+
+    def any_drone_in_range(self, x: int, y: int, radius: int) -> bool:
+        """ checks if a drone is within `radius` cells of (x, y) (wrapped chebyshev distance) """
+        return self.drone_index.any_within(x, y, radius)
+
+    def population(self) -> dict:
+        """
+        current population counts in O(1), the numbers of the GUI's statistics panel
+        - bots, parts (on the ground) and swarms are the lengths of the entity lists
+        - the rest comes from the running totals in self.counters
+        """
+        counters = self.counters
+        return {
+            "bots": len(self.bots),
+            "parts": len(self.parts),
+            "stored_parts": counters.stored_parts,
+            "active_drones": len(self.drones) - counters.hibernating_drones,
+            "hibernating_drones": counters.hibernating_drones,
+            "swarms": len(self.swarms),
+            "swarm_size": counters.swarm_size,
+        }
+
+    def _find_nearest_part(self, bot: SurvivorBot) -> Optional[SparePart]:
+        return self.part_index.nearest(bot.x, bot.y)
+
+    def _find_nearest_station(self, bot: SurvivorBot) -> Optional[RechargeStation]:
+        return self.station_index.nearest(bot.x, bot.y)
+
+    def _calculate_distance(self, x1: int, y1: int, x2: int, y2: int) -> float:
+        dx = min(abs(x2 - x1), self.size - abs(x2 - x1))
+        dy = min(abs(y2 - y1), self.size - abs(y2 - y1))
+        return (dx ** 2 + dy ** 2) ** 0.5
+
+    def _move_towards(self, bot: SurvivorBot, target_x: int, target_y: int):
+
+        if bot.energy <= 0:
+            return  # Don't move if no energy
+
+        new_x, new_y = self._next_step(bot.x, bot.y, target_x, target_y)
+        if bot.has_enough_energy_for_move():
+            bot.move(new_x, new_y, self.size)
+
+    def _next_step(self, x: int, y: int, target_x: int, target_y: int) -> Tuple[int, int]:
+        """ the wrapped cell one step from (x, y) towards the target, along the longer axis """
+        dx = (target_x - x + self.size // 2) % self.size - self.size // 2
+        dy = (target_y - y + self.size // 2) % self.size - self.size // 2
+
+        if abs(dx) > abs(dy):
+            return (x + (1 if dx > 0 else -1)) % self.size, y
+        return x, (y + (1 if dy > 0 else -1)) % self.size
+
+    def _route_to_station(self, x: int, y: int) -> Optional[Tuple[RechargeStation, int, int]]:
+        """ nearest station from a cell plus the next step towards it, looked up from the route table """
+        cell = y * self.size + x
+        route = self.station_routes[cell]
+        if route is None:
+            station = self.station_index.nearest(x, y)
+            if station is None:
+                return None
+            route = (station, *self._next_step(x, y, station.x, station.y))
+            self.station_routes[cell] = route
+        return route
+
+    def _reset_station_routes(self) -> None:
+        """ forget all cached routes; needed whenever the set of stations changes """
+        self.station_routes = [None] * (self.size * self.size)
+
+    def restore_from_state(self, state):
+        """ restore grid state from saved state (type: SimulationState) """
+        self._reset_station_routes()
+
+        # restore stations
+        for x, y, stored_parts_data in state.stations:
+            station = RechargeStation(x, y)
+            # Recreate stored parts
+            for part_x, part_y, part_size in stored_parts_data:
+                part = SparePart(part_x, part_y, part_size)
+                station.stored_parts.append(part)
+            self._add_entity(self.stations, station)
+
+        # restore bots
+        for x, y, energy, carried_part_data in state.bots:
+            bot = SurvivorBot(x, y)
+            bot.energy = energy
+            if carried_part_data:
+                # recreate carried part if it exists
+                carried_part = SparePart(*carried_part_data)
+                bot.carried_part = carried_part
+            self._add_entity(self.bots, bot)
+
+        # restore parts
+        for x, y, size in state.parts:
+            # convert size string to PartSize enum if needed
+            if isinstance(size, str):
+                size = PartSize[size.upper()]
+            part = SparePart(x, y, size)
+            self._add_entity(self.parts, part)
+
+        # restore drones
+        for x, y, energy, is_hibernating in state.drones:
+            drone = Drone(x, y, rng=self.rng)
+            drone.energy = energy
+            drone.is_hibernating = is_hibernating
+            self._add_entity(self.drones, drone)
+
+        # restore swarms
+        for x, y, size, consumed_material in state.swarms:
+            swarm = ScavengerSwarm(x, y, rng=self.rng)
+            swarm.size = size
+            swarm.consumed_material = consumed_material
+            self._add_entity(self.swarms, swarm)
+
+        if self.engine is not None:
+            self.engine.load()
+        self.step_count = state.step_count
+
+    def save_checkpoint(self, path: str, step_count: Optional[int] = None) -> None:
+        """ write the whole world, RNG state included, to a binary checkpoint file (at step_count by default) """
+        Checkpoint.save(self, path, self.step_count if step_count is None else step_count)
+
+    def restore_from_checkpoint(self, checkpoint: Checkpoint) -> int:
+        """
+        replace the world with a checkpoint's (see save_checkpoint); returns its step count
+        - the numpy engine loads bots, parts, drones and swarms straight from the
+          mapped records, only stations become objects
+        - the RNG state and the corrosion mode are restored too, so on the engine
+          it was saved with the run continues exactly as it would have (another
+          engine gets the world, but not the numpy engine's RNG); only the values
+          of the object engine's parts can differ in the last bits, as a part
+          resumes corroding from its saved value instead of from its boost
+        """
+        if checkpoint.size != self.size:
+            raise ValueError(f"checkpoint is for a {checkpoint.size}x{checkpoint.size} grid, not {self.size}x{self.size}")
+        self.clear_entities()
+
+        stored_parts = []
+        for x, y, size, value in checkpoint.rows("stored_parts"):
+            part = SparePart(x, y, PART_SIZES[size])
+            part.enhancement_value = value
+            stored_parts.append(part)
+        for x, y, first, count in checkpoint.rows("stations"):
+            station = RechargeStation(x, y)
+            station.stored_parts = stored_parts[first:first + count]
+            self._add_entity(self.stations, station)
+
+        if self.engine is not None:
+            self.engine.load_tables({name: checkpoint.array(name) for name in ("bots", "parts", "drones", "swarms")})
+        else:
+            for x, y, energy, rest_target, resting, carry, carry_value in checkpoint.rows("bots"):
+                bot = SurvivorBot(x, y)
+                bot.energy = energy
+                bot.rest_energy_target = rest_target
+                bot.resting = resting
+                if carry >= 0:
+                    bot.carried_part = SparePart(x, y, PART_SIZES[carry])
+                    bot.carried_part.enhancement_value = carry_value
+                self._add_entity(self.bots, bot)
+
+            for x, y, size, value in checkpoint.rows("parts"):
+                part = SparePart(x, y, PART_SIZES[size])
+                part.enhancement_value = value
+                self._add_entity(self.parts, part)
+
+            bots = list(self.bots)
+            for x, y, energy, hibernating, pursuing in checkpoint.rows("drones"):
+                drone = Drone(x, y, rng=self.rng)
+                drone.energy = energy
+                drone.is_hibernating = hibernating
+                drone.pursuing_bot = bots[pursuing] if pursuing >= 0 else None
+                self._add_entity(self.drones, drone)
+
+            for x, y, size, consumed in checkpoint.rows("swarms"):
+                swarm = ScavengerSwarm(x, y, rng=self.rng)
+                swarm.size = size
+                swarm.consumed_material = consumed
+                self._add_entity(self.swarms, swarm)
+
+        self.per_bot_corrosion = checkpoint.per_bot_corrosion
+        self.rng.setstate(checkpoint.rng_state)
+        if self.engine is not None and checkpoint.numpy_rng_state is not None:
+            self.engine.rng.bit_generator.state = checkpoint.numpy_rng_state
+        self.step_count = checkpoint.step_count
+        return checkpoint.step_count
+
+    @staticmethod
+    def renderer_for(canvas, size: int):
+        """ the renderer to draw a `size` x `size` world on `canvas` with """
+        # big grids are painted as one image instead of several canvas items per entity
+        if TkRenderer.CANVAS_SIZE // size >= TkRenderer.MIN_CELL_SIZE:
+            return TkRenderer(canvas, size)
+        return RasterRenderer(canvas, size)
+
+    def display_tkinter(self, canvas):
+        """Display the current state of the grid using Tkinter"""
+        # the renderer keeps canvas items between frames, so it's reused for as long as the canvas is
+        if self.renderer is None or self.renderer.canvas is not canvas:
+            self.renderer = self.renderer_for(canvas, self.size)
+        self.renderer.render(self)
+        canvas.update()
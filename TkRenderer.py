@@ -0,0 +1,211 @@
+from typing import Dict, Tuple
+
+from Colors import COLORS
+from SparePart import PART_COLOR
+
+
+class TkRenderer:
+    """
+    Retained-mode renderer for a TechburgGrid on a tkinter Canvas
+
+    grid lines are drawn once. Every entity keeps its own group of canvas
+    items between frames; per frame only entities that moved or changed get
+    `coords`/`itemconfig` calls, and items are only created or deleted when
+    entities appear or disappear.
+    """
+
+    CANVAS_SIZE = 1000
+    # below this many pixels per cell the per-entity items are unreadable; display_tkinter switches to RasterRenderer
+    MIN_CELL_SIZE = 5
+    # stacking order, bottom to top (same as the order display_tkinter used to draw in)
+    LAYERS = ("part", "station", "bot", "drone", "swarm")
+
+    def __init__(self, canvas, grid_size: int):
+        self.canvas = canvas
+        self.grid_size = grid_size
+        self.cell_size = self.CANVAS_SIZE // grid_size
+        # (layer, entity) -> (item ids, last drawn state)
+        self.items: Dict[Tuple[str, object], Tuple[Tuple[int, ...], tuple]] = {}
+        self.grid_drawn = False
+
+    def render(self, world) -> None:
+        """ draw `world` (anything with stations/bots/parts/drones/swarms lists) """
+        if not self.grid_drawn:
+            self._draw_grid_lines()
+
+        seen = set()
+        created = False
+        for layer, entities, state_of in (
+                ("part", world.parts, self._part_state),
+                ("station", world.stations, self._station_state),
+                ("bot", world.bots, self._bot_state),
+                ("drone", world.drones, self._drone_state),
+                ("swarm", world.swarms, self._swarm_state)):
+            create = getattr(self, f"_create_{layer}")
+            update = getattr(self, f"_update_{layer}")
+            for entity in entities:
+                key = (layer, entity)
+                seen.add(key)
+                state = state_of(entity)
+                entry = self.items.get(key)
+                if entry is None:
+                    self.items[key] = (create(state), state)
+                    created = True
+                elif entry[1] != state:
+                    update(entry[0], entry[1], state)
+                    self.items[key] = (entry[0], state)
+
+        for key in [key for key in self.items if key not in seen]:
+            for item in self.items.pop(key)[0]:
+                self.canvas.delete(item)
+
+        if created:
+            for layer in self.LAYERS:
+                self.canvas.tag_raise(layer)
+
+    def clear(self) -> None:
+        """ forget every entity item (the grid lines stay) """
+        for item_ids, _ in self.items.values():
+            for item in item_ids:
+                self.canvas.delete(item)
+        self.items = {}
+
+    # ---------------------------------------------------------------- states
+
+    @staticmethod
+    def _part_state(part) -> tuple:
+        return (part.x, part.y, PART_COLOR[part.size], part.size.name[0])
+
+    @staticmethod
+    def _station_state(station) -> tuple:
+        return (station.x, station.y, len(station.stored_parts))
+
+    @staticmethod
+    def _bot_state(bot) -> tuple:
+        return (bot.x, bot.y, int(bot.energy), bool(bot.carried_part))
+
+    @staticmethod
+    def _drone_state(drone) -> tuple:
+        return (drone.x, drone.y, int(drone.energy), drone.is_hibernating)
+
+    @staticmethod
+    def _swarm_state(swarm) -> tuple:
+        return (swarm.x, swarm.y, swarm.size)
+
+    # ------------------------------------------------------------------ items
+
+    def _draw_grid_lines(self) -> None:
+        size, cell = self.grid_size, self.cell_size
+        for i in range(size + 1):
+            self.canvas.create_line(i * cell, 0, i * cell, size * cell, tags="grid")
+            self.canvas.create_line(0, i * cell, size * cell, i * cell, tags="grid")
+        self.grid_drawn = True
+
+    def _font(self) -> tuple:
+        return ("Arial", max(8, self.cell_size // 4))
+
+    def _box(self, x: int, y: int, inset: int) -> tuple:
+        cell = self.cell_size
+        return (x * cell + inset, y * cell + inset, x * cell + cell - inset, y * cell + cell - inset)
+
+    def _centre(self, x: int, y: int) -> tuple:
+        cell = self.cell_size
+        return (x * cell + cell // 2, y * cell + cell // 2)
+
+    def _create_part(self, state) -> tuple:
+        x, y, color, letter = state
+        return (self.canvas.create_oval(*self._box(x, y, 4), fill=color, outline="black", tags="part"),
+                # size indicator for the spare parts (S/M/L)
+                self.canvas.create_text(*self._centre(x, y), text=letter, fill="black", tags="part"))
+
+    def _update_part(self, items, old, new) -> None:
+        oval, text = items
+        x, y, color, letter = new
+        if old[:2] != new[:2]:
+            self.canvas.coords(oval, *self._box(x, y, 4))
+            self.canvas.coords(text, *self._centre(x, y))
+        if old[2:] != new[2:]:
+            self.canvas.itemconfig(oval, fill=color)
+            self.canvas.itemconfig(text, text=letter)
+
+    def _create_station(self, state) -> tuple:
+        x, y, num_parts = state
+        return (self.canvas.create_rectangle(*self._box(x, y, 2), fill=COLORS["recharge_station"],
+                                             tags="station"),
+                # number of stored parts
+                self.canvas.create_text(*self._centre(x, y), text=str(num_parts), fill="white",
+                                        tags="station"))
+
+    def _update_station(self, items, old, new) -> None:
+        body, text = items
+        x, y, num_parts = new
+        if old[:2] != new[:2]:
+            self.canvas.coords(body, *self._box(x, y, 2))
+            self.canvas.coords(text, *self._centre(x, y))
+        self.canvas.itemconfig(text, text=str(num_parts))
+
+    def _create_bot(self, state) -> tuple:
+        x, y, energy, carrying = state
+        # orange border marks bots carrying a part; hidden otherwise
+        border = self.canvas.create_rectangle(*self._box(x, y, 0), outline="orange", width=4,
+                                              state="normal" if carrying else "hidden", tags="bot")
+        body = self.canvas.create_rectangle(*self._box(x, y, 2), fill=COLORS["bot"], outline="black",
+                                            width=1, tags="bot")
+        text = self.canvas.create_text(*self._centre(x, y), text=f"{energy}%", fill="white",
+                                       font=self._font(), tags="bot")
+        return (border, body, text)
+
+    def _update_bot(self, items, old, new) -> None:
+        border, body, text = items
+        x, y, energy, carrying = new
+        if old[:2] != new[:2]:
+            self.canvas.coords(border, *self._box(x, y, 0))
+            self.canvas.coords(body, *self._box(x, y, 2))
+            self.canvas.coords(text, *self._centre(x, y))
+        if old[2] != energy:
+            self.canvas.itemconfig(text, text=f"{energy}%")
+        if old[3] != carrying:
+            self.canvas.itemconfig(border, state="normal" if carrying else "hidden")
+
+    def _create_drone(self, state) -> tuple:
+        x, y, energy, hibernating = state
+        color = COLORS["drone_hibernating"] if hibernating else COLORS["drone"]
+        return (self.canvas.create_rectangle(*self._box(x, y, 2), fill=color, outline="black", tags="drone"),
+                self.canvas.create_text(*self._centre(x, y), text=f"{energy}%", fill="white",
+                                        font=self._font(), tags="drone"))
+
+    def _update_drone(self, items, old, new) -> None:
+        body, text = items
+        x, y, energy, hibernating = new
+        if old[:2] != new[:2]:
+            self.canvas.coords(body, *self._box(x, y, 2))
+            self.canvas.coords(text, *self._centre(x, y))
+        if old[2] != energy:
+            self.canvas.itemconfig(text, text=f"{energy}%")
+        if old[3] != hibernating:
+            self.canvas.itemconfig(body, fill=COLORS["drone_hibernating"] if hibernating else COLORS["drone"])
+
+    def _decay_circle(self, x: int, y: int) -> tuple:
+        cx, cy = self._centre(x, y)
+        radius = self.cell_size * 1.5   # visual indicator for the 1-cell decay range
+        return (cx - radius, cy - radius, cx + radius, cy + radius)
+
+    def _create_swarm(self, state) -> tuple:
+        x, y, size = state
+        return (self.canvas.create_rectangle(*self._box(x, y, 2), fill=COLORS["swarm"], outline="black",
+                                             tags="swarm"),
+                self.canvas.create_text(*self._centre(x, y), text=str(size), fill="white",
+                                        font=self._font(), tags="swarm"),
+                # semi-transparent decay field
+                self.canvas.create_oval(*self._decay_circle(x, y), fill='', outline=COLORS["swarm"],
+                                        stipple='gray50', tags="swarm"))
+
+    def _update_swarm(self, items, old, new) -> None:
+        body, text, field = items
+        x, y, size = new
+        if old[:2] != new[:2]:
+            self.canvas.coords(body, *self._box(x, y, 2))
+            self.canvas.coords(text, *self._centre(x, y))
+            self.canvas.coords(field, *self._decay_circle(x, y))
+        if old[2] != size:
+            self.canvas.itemconfig(text, text=str(size))
@@ -0,0 +1,28 @@
+from typing import List
+
+
+class UnionFind:
+    """
+    Disjoint sets over the integers 0 .. count - 1
+
+    the smallest member is always the root of its set, so `find` answers
+    "which member comes first" (e.g. in list order) without extra
+    bookkeeping. Finds use path halving.
+    """
+
+    def __init__(self, count: int):
+        self.parent: List[int] = list(range(count))
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, a: int, b: int) -> None:
+        a, b = self.find(a), self.find(b)
+        if a < b:
+            self.parent[b] = a
+        elif b < a:
+            self.parent[a] = b
@@ -0,0 +1,36 @@
+import heapq
+from typing import List, Tuple
+
+
+class WakeScheduler:
+    """
+    Priority queue of parked entities, ordered by the step they wake up in
+
+    an entity whose next steps are fully predictable (e.g. a hibernating
+    drone, which only recharges) is parked here instead of being updated
+    every step; the grid pops it again with `due` once its wake-up step
+    comes round. Each entity is parked with an `order` (its position in the
+    grid's list) so woken entities can rejoin the update loop in list order.
+    """
+
+    def __init__(self):
+        self.queue: List[Tuple[int, int, object]] = []     # (wake step, order, entity)
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    def park(self, entity, wake_step: int, order: int) -> None:
+        heapq.heappush(self.queue, (wake_step, order, entity))
+
+    def due(self, step: int) -> List[Tuple[int, object]]:
+        """ (order, entity) of everything waking up in or before `step`, sorted by order """
+        woken = []
+        queue = self.queue
+        while queue and queue[0][0] <= step:
+            _, order, entity = heapq.heappop(queue)
+            woken.append((order, entity))
+        woken.sort(key=lambda item: item[0])
+        return woken
+
+    def clear(self) -> None:
+        self.queue = []
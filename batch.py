@@ -0,0 +1,98 @@
+import argparse
+import sys
+import time
+from typing import Optional
+
+from TechburgGrid import TechburgGrid
+from Checkpoint import Checkpoint
+from main import GRID_SIZE, NUM_STATIONS, NUM_BOTS, NUM_PARTS, NUM_DRONES, NUM_SWARMS
+
+
+def build_grid(grid_size: int = GRID_SIZE,
+               num_stations: int = NUM_STATIONS,
+               num_bots: int = NUM_BOTS,
+               num_parts: int = NUM_PARTS,
+               num_drones: int = NUM_DRONES,
+               num_swarms: int = NUM_SWARMS,
+               engine: str = "object",
+               seed: Optional[int] = None) -> TechburgGrid:
+    """ create and populate a grid with the same parameters as the GUI """
+    grid = TechburgGrid(grid_size, engine=engine, seed=seed)
+    grid.initialize_simulation(
+        num_stations=num_stations,
+        num_bots=num_bots,
+        num_parts=num_parts,
+        num_drones=num_drones,
+        num_swarms=num_swarms
+    )
+    return grid
+
+
+def population(grid: TechburgGrid) -> dict:
+    """ current population counts, the same numbers as the GUI's statistics panel """
+    return grid.population()
+
+
+def run(grid: TechburgGrid, steps: int) -> float:
+    """ run the simulation without rendering, returns the elapsed wall time in seconds """
+    start = time.perf_counter()
+    for _ in range(steps):
+        grid.simulate_step()
+    return time.perf_counter() - start
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Techburg simulation without a GUI")
+    parser.add_argument("--steps", type=int, default=1000, help="number of simulation steps")
+    parser.add_argument("--grid-size", type=int, default=GRID_SIZE)
+    parser.add_argument("--stations", type=int, default=NUM_STATIONS)
+    parser.add_argument("--bots", type=int, default=NUM_BOTS)
+    parser.add_argument("--parts", type=int, default=NUM_PARTS)
+    parser.add_argument("--drones", type=int, default=NUM_DRONES)
+    parser.add_argument("--swarms", type=int, default=NUM_SWARMS)
+    parser.add_argument("--engine", choices=TechburgGrid.ENGINES, default=None,
+                        help="default: object, or the checkpoint's engine with --resume")
+    parser.add_argument("--seed", type=int, default=None, help="seed for a reproducible run")
+    parser.add_argument("--resume", metavar="PATH", help="start from a checkpoint instead of a new world")
+    parser.add_argument("--checkpoint", metavar="PATH", help="save the world to a checkpoint at the end")
+    parser.add_argument("--record", metavar="DIR", help="log events and keyframes to DIR (see Replay)")
+    parser.add_argument("--keyframe-interval", type=int, default=1000, help="steps between recorded keyframes")
+    parser.add_argument("--metrics", metavar="PATH", help="stream per-step metrics to PATH (.csv, otherwise JSON lines)")
+    parser.add_argument("--sample-every", type=int, default=1, help="steps between metrics samples")
+    parser.add_argument("--downsample", type=int, default=1, help="metrics samples combined into each written row")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.resume:
+        with Checkpoint(args.resume) as checkpoint:
+            engine = args.engine or checkpoint.engine
+            if engine != checkpoint.engine:
+                print(f"warning: {args.resume} was saved by the {checkpoint.engine} engine, "
+                      f"the run won't continue exactly as it would have on it", file=sys.stderr)
+            grid = TechburgGrid(checkpoint.size, engine=engine)
+            grid.restore_from_checkpoint(checkpoint)
+    else:
+        grid = build_grid(args.grid_size, args.stations, args.bots, args.parts,
+                          args.drones, args.swarms, engine=args.engine or "object", seed=args.seed)
+    if args.record:
+        grid.start_recording(args.record, args.keyframe_interval)
+    if args.metrics:
+        grid.start_metrics(args.metrics, args.sample_every, args.downsample)
+
+    elapsed = run(grid, args.steps)
+    grid.stop_recording()
+    grid.stop_metrics()
+
+    steps_per_sec = args.steps / elapsed if elapsed > 0 else float("inf")
+    print(f"Steps: {args.steps} in {elapsed:.3f}s ({steps_per_sec:.1f} steps/sec)")
+    if args.checkpoint:
+        grid.save_checkpoint(args.checkpoint)
+        print(f"Saved step {grid.step_count} to {args.checkpoint}")
+    for name, count in population(grid).items():
+        print(f"{name.replace('_', ' ').capitalize()}: {count}")
+
+
+if __name__ == "__main__":
+    main()
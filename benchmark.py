@@ -0,0 +1,190 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from TechburgGrid import TechburgGrid
+from TkRenderer import TkRenderer
+from RasterRenderer import RasterRenderer
+from ArrayEngine import np
+from SimulationState import SimulationState
+from main import GRID_SIZE, NUM_STATIONS, NUM_BOTS, NUM_PARTS, NUM_DRONES, NUM_SWARMS
+
+
+GRID_SIZES = [30, 100, 300, 1000, 2000]
+DENSITIES = [1, 10, 100]            # multiples of the default main.py entity mix
+MAX_OCCUPANCY = 0.5                 # skip worlds where bots + parts would fill more than half the cells
+
+
+class StubCanvas:
+    """ stands in for a tk.Canvas so rendering cost can be timed without a display """
+
+    def __init__(self):
+        self.calls = 0
+        self.next_item = 0
+
+    def _create(self, *args, **kwargs) -> int:
+        self.calls += 1
+        self.next_item += 1
+        return self.next_item
+
+    def _call(self, *args, **kwargs):
+        self.calls += 1
+
+    create_line = create_oval = create_rectangle = create_text = create_image = _create
+    delete = coords = itemconfig = itemconfigure = tag_raise = tag_lower = update = _call
+
+    def winfo_width(self) -> int:
+        return 1000
+
+    def winfo_height(self) -> int:
+        return 1000
+
+
+class StubPhotoImage:
+    """ stands in for a tk.PhotoImage; the frame is still built, only handing it to Tk is skipped """
+
+    def __init__(self, master=None, width=0, height=0):
+        self.master = master
+        self.tk = self      # image.tk.call(...), as on a real PhotoImage
+        master.calls += 1
+
+    def configure(self, **options):
+        self.master.calls += 1
+
+    def call(self, *args):
+        self.master.calls += 1
+
+
+def entity_counts(grid_size: int, density: int) -> dict:
+    """ the default mix scaled by `density`; stations sit on one row so they scale with the width """
+    return {
+        "num_stations": max(1, min(grid_size, NUM_STATIONS * grid_size // GRID_SIZE)),
+        "num_bots": NUM_BOTS * density,
+        "num_parts": NUM_PARTS * density,
+        "num_drones": NUM_DRONES * density,
+        "num_swarms": NUM_SWARMS * density,
+    }
+
+
+def build(grid_size: int, counts: dict, engine: str, seed: int) -> TechburgGrid:
+    grid = TechburgGrid(grid_size, engine=engine, seed=seed)
+    grid.initialize_simulation(**counts)
+    return grid
+
+
+def time_steps(grid: TechburgGrid, steps: int, max_seconds: float) -> dict:
+    """ run up to `steps` steps, stopping early once `max_seconds` is used up """
+    done = 0
+    start = time.perf_counter()
+    while done < steps:
+        grid.simulate_step()
+        done += 1
+        if time.perf_counter() - start > max_seconds:
+            break
+    elapsed = time.perf_counter() - start
+    return {"steps": done, "seconds": elapsed, "steps_per_sec": done / elapsed if elapsed > 0 else None}
+
+
+def bench_config(grid_size: int, density: int, engine: str, args) -> dict:
+    counts = entity_counts(grid_size, density)
+    result = {"grid_size": grid_size, "density": density, "engine": engine, **counts}
+
+    occupancy = (counts["num_stations"] + counts["num_bots"] + counts["num_parts"]) / (grid_size * grid_size)
+    if occupancy > MAX_OCCUPANCY:
+        result["skipped"] = f"occupancy {occupancy:.0%} above {MAX_OCCUPANCY:.0%}"
+        return result
+
+    start = time.perf_counter()
+    grid = build(grid_size, counts, engine, args.seed)
+    result["initialize_seconds"] = time.perf_counter() - start
+
+    result["simulate_step"] = time_steps(grid, args.steps, args.max_seconds)
+
+    canvas = StubCanvas()
+    if TkRenderer.CANVAS_SIZE // grid_size < TkRenderer.MIN_CELL_SIZE:
+        # the grid would pick the raster renderer itself, but that needs a real Tk for its PhotoImage
+        grid.renderer = RasterRenderer(canvas, grid_size, photo_image=StubPhotoImage)
+    # the first frame creates every canvas item; after that the renderer only
+    # touches what changed, so each later frame follows an (untimed) step
+    start = time.perf_counter()
+    grid.display_tkinter(canvas)
+    first_frame = {"seconds": time.perf_counter() - start, "canvas_calls": canvas.calls}
+    seconds = 0.0
+    for _ in range(args.frames):
+        grid.simulate_step()
+        start = time.perf_counter()
+        grid.display_tkinter(canvas)
+        seconds += time.perf_counter() - start
+    result["display_tkinter"] = {
+        "renderer": type(grid.renderer).__name__,
+        "first_frame": first_frame,
+        "frames": args.frames,
+        "seconds_per_frame": seconds / args.frames if args.frames else None,
+        "canvas_calls_per_frame": (canvas.calls - first_frame["canvas_calls"]) / args.frames if args.frames else None,
+    }
+
+    state = SimulationState(grid.stations, grid.bots, grid.parts, grid.drones, grid.swarms, 0)
+    start = time.perf_counter()
+    grid.clear_entities()
+    grid.restore_from_state(state)
+    result["restore_from_state_seconds"] = time.perf_counter() - start
+
+    # peak memory is measured on a separate, shorter run since tracing slows everything down
+    del grid, state
+    tracemalloc.start()
+    grid = build(grid_size, counts, engine, args.seed)
+    for _ in range(args.memory_steps):
+        grid.simulate_step()
+    result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark TechburgGrid across grid sizes and entity densities")
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--grid-size", type=int, nargs="+", default=GRID_SIZES)
+    parser.add_argument("--density", type=int, nargs="+", default=DENSITIES)
+    parser.add_argument("--engine", nargs="+", choices=TechburgGrid.ENGINES,
+                        default=["object", "numpy"] if np is not None else ["object"])
+    parser.add_argument("--steps", type=int, default=100, help="steps timed per configuration")
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="time budget for the timed steps")
+    parser.add_argument("--frames", type=int, default=3, help="display_tkinter calls timed per configuration, each after a step (plus the first frame)")
+    parser.add_argument("--memory-steps", type=int, default=5, help="steps run while tracing memory")
+    parser.add_argument("--seed", type=int, default=1)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = []
+    for engine in args.engine:
+        for grid_size in args.grid_size:
+            for density in args.density:
+                result = bench_config(grid_size, density, engine, args)
+                results.append(result)
+                if "skipped" in result:
+                    print(f"{engine:>6} size={grid_size:<5} x{density:<4} skipped ({result['skipped']})")
+                else:
+                    print(f"{engine:>6} size={grid_size:<5} x{density:<4} "
+                          f"{result['simulate_step']['steps_per_sec']:10.1f} steps/sec  "
+                          f"{result['peak_memory_bytes'] / 2 ** 20:8.1f} MiB peak")
+
+    report = {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "numpy": np.__version__ if np is not None else None,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "arguments": vars(args),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import argparse
+import itertools
+import json
+import os
+from multiprocessing import Pool
+
+from TechburgGrid import TechburgGrid
+from batch import build_grid, population
+from main import GRID_SIZE, NUM_STATIONS, NUM_BOTS, NUM_PARTS, NUM_DRONES, NUM_SWARMS
+
+
+TAIL_BLOCK = 64 * 1024      # bytes read at a time when looking for the last line break
+
+
+def run_id(params: dict) -> str:
+    """
+    stable key of one run, used to skip finished runs when resuming
+    - made of every parameter (sample_every included), since each of them changes the summary
+    """
+    return ",".join(f"{name}={params[name]}" for name in sorted(params))
+
+
+def run_one(params: dict) -> dict:
+    """
+    run a single simulation and summarise it
+    - survivors, stored parts and swarm count are sampled every `sample_every` steps
+    - the grid is seeded with the run's seed, so every run can be reproduced on its own
+    """
+    grid = build_grid(params["grid_size"], params["num_stations"], params["num_bots"],
+                      params["num_parts"], params["num_drones"], params["num_swarms"],
+                      engine=params["engine"], seed=params["seed"])
+
+    samples = {"step": [], "survivors": [], "stored_parts": [], "swarms": []}
+    for step in range(params["steps"] + 1):
+        if step % params["sample_every"] == 0 or step == params["steps"]:
+            counts = population(grid)
+            samples["step"].append(step)
+            samples["survivors"].append(counts["bots"])
+            samples["stored_parts"].append(counts["stored_parts"])
+            samples["swarms"].append(counts["swarms"])
+        if step < params["steps"]:
+            grid.simulate_step()
+
+    return {"run_id": run_id(params), "params": params, "final": population(grid), **samples}
+
+
+def completed_runs(path: str) -> set:
+    """ run ids already written to the output file (a half-written last line is ignored) """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path) as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["run_id"])
+            except (ValueError, KeyError):
+                continue
+    return done
+
+
+def drop_partial_line(path: str) -> None:
+    """ cut a half-written last line (left by an interrupted sweep) so new summaries start on a line of their own """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        # scan backwards from the end a block at a time, the file itself can be large
+        end = f.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(0, end - TAIL_BLOCK)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            end = start
+        f.truncate(end)
+
+
+def sweep_params(args) -> list:
+    """ every combination of the sweep's parameter lists, one entry per seed """
+    runs = []
+    for grid_size, num_stations, num_bots, num_parts, num_drones, num_swarms, seed in itertools.product(
+            args.grid_size, args.stations, args.bots, args.parts, args.drones, args.swarms,
+            range(args.first_seed, args.first_seed + args.seeds)):
+        runs.append({
+            "grid_size": grid_size,
+            "num_stations": num_stations,
+            "num_bots": num_bots,
+            "num_parts": num_parts,
+            "num_drones": num_drones,
+            "num_swarms": num_swarms,
+            "steps": args.steps,
+            "seed": seed,
+            "sample_every": args.sample_every,
+            "engine": args.engine,
+        })
+    return runs
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run a parameter sweep of Techburg simulations in parallel")
+    parser.add_argument("--output", default="sweep.jsonl", help="JSON-lines file, one summary per run")
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--seeds", type=int, default=10, help="number of seeds per parameter combination")
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--sample-every", type=int, default=10, help="steps between population samples")
+    parser.add_argument("--grid-size", type=int, nargs="+", default=[GRID_SIZE])
+    parser.add_argument("--stations", type=int, nargs="+", default=[NUM_STATIONS])
+    parser.add_argument("--bots", type=int, nargs="+", default=[NUM_BOTS])
+    parser.add_argument("--parts", type=int, nargs="+", default=[NUM_PARTS])
+    parser.add_argument("--drones", type=int, nargs="+", default=[NUM_DRONES])
+    parser.add_argument("--swarms", type=int, nargs="+", default=[NUM_SWARMS])
+    parser.add_argument("--engine", choices=TechburgGrid.ENGINES, default="object")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    runs = sweep_params(args)
+    done = completed_runs(args.output)
+    pending = [params for params in runs if run_id(params) not in done]
+    print(f"{len(runs)} runs, {len(runs) - len(pending)} already done, {len(pending)} to go")
+
+    # results are appended as each run finishes, so an interrupted sweep can be resumed
+    drop_partial_line(args.output)
+    with open(args.output, "a") as out, Pool(processes=args.processes) as pool:
+        for finished, summary in enumerate(pool.imap_unordered(run_one, pending), start=1):
+            out.write(json.dumps(summary) + "\n")
+            out.flush()
+            print(f"[{finished}/{len(pending)}] {summary['run_id']}: {summary['final']['bots']} survivors")
+
+
+if __name__ == "__main__":
+    main()
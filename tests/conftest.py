@@ -0,0 +1,28 @@
+import os
+import sys
+
+# the modules live at the top of the repository, next to main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SimulationState import RECORDS
+
+
+def bot_state(bot) -> tuple:
+    # a carried part keeps the cell it was picked up from (checkpoints put it on the bot's
+    # cell), which is never read: drop_part moves it to the bot first. Its value is rounded
+    # like part_values are compared after a restore (see restore_from_checkpoint)
+    part = bot.carried_part
+    return (bot.x, bot.y, bot.energy, bot.resting,
+            (part.size, round(part.enhancement_value, 12)) if part is not None else None)
+
+
+def world(grid) -> tuple:
+    """ everything about a grid's entities as plain tuples, for comparing runs """
+    return tuple(tuple((bot_state if name == "bots" else record)(entity) for entity in getattr(grid, name))
+                 for name, record in RECORDS.items())
+
+
+def part_values(grid) -> list:
+    """ enhancement values of the parts on the ground, then of those in each station """
+    return [part.enhancement_value for part in grid.parts] + \
+        [part.enhancement_value for station in grid.stations for part in station.stored_parts]
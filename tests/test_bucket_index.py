@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from BucketIndex import BucketIndex
+from batch import build_grid
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def distance(size, x1, y1, x2, y2):
+    dx = min(abs(x2 - x1), size - abs(x2 - x1))
+    dy = min(abs(y2 - y1), size - abs(y2 - y1))
+    return (dx ** 2 + dy ** 2) ** 0.5
+
+
+def brute_force(points, size, x, y):
+    """ the search the index replaces: min() over the list, first one wins ties """
+    return min(points, key=lambda p: distance(size, x, y, p.x, p.y), default=None)
+
+
+# small grids make equal distances (and so tie-breaking) common; 7 and 5 don't divide 30
+@pytest.mark.parametrize("size, bucket_size", [(16, 1), (16, 4), (16, 16), (30, 7), (30, 5), (9, 32)])
+def test_nearest_matches_brute_force(size, bucket_size):
+    rng = random.Random(size * 100 + bucket_size)
+    index = BucketIndex(size, bucket_size)
+    points = []
+    for _ in range(600):
+        action = rng.random()
+        if action < 0.45 or not points:
+            point = Point(rng.randrange(size), rng.randrange(size))
+            points.append(point)
+            index.add(point)
+        elif action < 0.7:
+            point = points.pop(rng.randrange(len(points)))
+            index.remove(point)
+        else:
+            point = rng.choice(points)
+            x, y = rng.randrange(size), rng.randrange(size)
+            index.move(point, x, y)
+            point.x, point.y = x, y
+
+        assert len(index) == len(points)
+        for _ in range(5):
+            x, y = rng.randrange(size), rng.randrange(size)
+            assert index.nearest(x, y) is brute_force(points, size, x, y)
+
+
+def test_empty_index():
+    index = BucketIndex(10)
+    assert index.nearest(3, 4) is None
+    point = Point(1, 1)
+    index.add(point)
+    index.remove(point)
+    assert index.nearest(3, 4) is None
+
+
+def test_grid_queries_match_full_scan():
+    # parts are picked up, knocked loose by drones and eaten by swarms along the way
+    grid = build_grid(40, 4, 60, 150, 20, 8, seed=3)
+    for _ in range(150):
+        for bot in grid.bots:
+            assert grid._find_nearest_part(bot) is brute_force(grid.parts, grid.size, bot.x, bot.y)
+            assert grid._find_nearest_station(bot) is brute_force(grid.stations, grid.size, bot.x, bot.y)
+        grid.simulate_step()
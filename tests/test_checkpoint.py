@@ -0,0 +1,108 @@
+import pytest
+
+from Checkpoint import Checkpoint, HEADER
+from TechburgGrid import TechburgGrid
+from batch import build_grid
+from conftest import part_values, world
+
+
+def continued(grid, steps: int) -> tuple:
+    states, values = [], []
+    for _ in range(steps):
+        grid.simulate_step()
+        states.append(world(grid))
+        values.extend(part_values(grid))
+    return states, values
+
+
+@pytest.mark.parametrize("engine", ["object", "numpy"])
+@pytest.mark.parametrize("per_bot_corrosion", [False, True])
+def test_resume_matches_continuous_run(tmp_path, engine, per_bot_corrosion):
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+    path = str(tmp_path / "world.tbcp")
+    grid = build_grid(40, 4, 40, 100, 12, 10, engine=engine, seed=9)
+    grid.per_bot_corrosion = per_bot_corrosion
+    for _ in range(40):
+        grid.simulate_step()
+    grid.save_checkpoint(path)
+    saved = world(grid), part_values(grid)
+    states, values = continued(grid, 40)
+
+    # a differently seeded world with the other corrosion mode, replaced by the checkpoint
+    resumed = build_grid(40, 2, 5, 5, 1, 1, engine=engine, seed=123)
+    resumed.per_bot_corrosion = not per_bot_corrosion
+    with Checkpoint(path) as checkpoint:
+        assert (checkpoint.engine, checkpoint.per_bot_corrosion) == (engine, per_bot_corrosion)
+        assert resumed.restore_from_checkpoint(checkpoint) == 40
+    assert resumed.step_count == 40
+    assert resumed.per_bot_corrosion == per_bot_corrosion
+    assert (world(resumed), part_values(resumed)) == saved
+    assert resumed.population() == build_population(resumed)
+    # part values may differ in the last bits, see restore_from_checkpoint
+    resumed_states, resumed_values = continued(resumed, 40)
+    assert resumed_states == states
+    assert resumed_values == pytest.approx(values, abs=1e-12)
+
+
+def build_population(grid) -> dict:
+    """ population() counted the slow way """
+    return {
+        "bots": len(grid.bots),
+        "parts": len(grid.parts),
+        "stored_parts": sum(len(station.stored_parts) for station in grid.stations),
+        "active_drones": sum(not drone.is_hibernating for drone in grid.drones),
+        "hibernating_drones": sum(drone.is_hibernating for drone in grid.drones),
+        "swarms": len(grid.swarms),
+        "swarm_size": sum(swarm.size for swarm in grid.swarms),
+    }
+
+
+def test_rows_match_the_world(tmp_path):
+    path = str(tmp_path / "world.tbcp")
+    grid = build_grid(30, 3, 20, 50, 6, 5, seed=4)
+    for _ in range(30):
+        grid.simulate_step()
+    grid.save_checkpoint(path)
+
+    with Checkpoint(path) as checkpoint:
+        assert (checkpoint.size, checkpoint.step_count) == (30, 30)
+        for name in ("stations", "bots", "parts", "drones", "swarms"):
+            assert checkpoint.counts[name] == len(getattr(grid, name))
+        assert checkpoint.counts["stored_parts"] == sum(len(station.stored_parts) for station in grid.stations)
+        assert [row[:2] for row in checkpoint.rows("parts")] == [(part.x, part.y) for part in grid.parts]
+        assert [row[3] for row in checkpoint.rows("parts")] == [part.enhancement_value for part in grid.parts]
+        assert checkpoint.row("bots", 0)[:3] == (grid.bots[0].x, grid.bots[0].y, grid.bots[0].energy)
+        with pytest.raises(IndexError):
+            checkpoint.row("bots", len(grid.bots))
+
+
+def test_version_1_has_per_step_corrosion(tmp_path):
+    path = tmp_path / "world.tbcp"
+    grid = build_grid(30, 3, 20, 50, 6, 5, seed=4)
+    grid.save_checkpoint(str(path))
+    data = bytearray(path.read_bytes())
+    data[4:6] = (1).to_bytes(2, "little")      # version 1 files only ever set the engine flag
+    path.write_bytes(bytes(data))
+
+    resumed = TechburgGrid(30, per_bot_corrosion=True)
+    with Checkpoint(str(path)) as checkpoint:
+        resumed.restore_from_checkpoint(checkpoint)
+    assert not resumed.per_bot_corrosion
+    assert (world(resumed), part_values(resumed)) == (world(grid), part_values(grid))
+
+
+def test_rejects_other_files(tmp_path):
+    grid = build_grid(30, 3, 20, 50, 6, 5, seed=4)
+    path = tmp_path / "world.tbcp"
+    grid.save_checkpoint(str(path))
+    data = path.read_bytes()
+
+    with Checkpoint(str(path)) as checkpoint, pytest.raises(ValueError):
+        TechburgGrid(20).restore_from_checkpoint(checkpoint)
+    for name, content in [("empty", b""), ("magic", b"XXXX" + data[4:]), ("short", data[:HEADER.size]),
+                          ("truncated", data[:-1]), ("version", data[:4] + (99).to_bytes(2, "little") + data[6:])]:
+        bad = tmp_path / name
+        bad.write_bytes(content)
+        with pytest.raises(ValueError):
+            Checkpoint(str(bad))
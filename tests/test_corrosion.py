@@ -0,0 +1,72 @@
+import pytest
+
+from RechargeStation import RechargeStation
+from SparePart import SparePart, PartSize
+from SurvivorBot import SurvivorBot
+from TechburgGrid import TechburgGrid
+
+
+def eager(size: PartSize, ticks: int) -> float:
+    """ the value of a part corroded the old way, one corrode() call per tick """
+    part = SparePart(0, 0, size)
+    for _ in range(ticks):
+        part.corrode()
+    return part.enhancement_value
+
+
+def small_world(engine: str, per_bot_corrosion: bool):
+    """
+    two active bots, one resting and one out of energy; the second bot starts
+    next to a part and picks it up in the first step, the other parts are too
+    far away for any bot to reach in ten steps
+    """
+    grid = TechburgGrid(30, engine=engine, per_bot_corrosion=per_bot_corrosion)
+    grid._add_entity(grid.stations, RechargeStation(15, 29))
+    grid._add_entity(grid.bots, SurvivorBot(0, 0))
+    grid._add_entity(grid.bots, SurvivorBot(10, 10))
+    resting = SurvivorBot(20, 5)
+    resting.resting = True
+    grid._add_entity(grid.bots, resting)
+    drained = SurvivorBot(25, 25)
+    drained.energy = 0.0
+    grid._add_entity(grid.bots, drained)
+    grid._add_entity(grid.parts, SparePart(11, 10, PartSize.SMALL))
+    grid._add_entity(grid.parts, SparePart(15, 15, PartSize.LARGE))
+    grid._add_entity(grid.parts, SparePart(5, 20, PartSize.MEDIUM))
+    if grid.engine is not None:
+        grid.engine.load()
+    return grid
+
+
+@pytest.mark.parametrize("engine", ["object", "numpy"])
+@pytest.mark.parametrize("per_bot_corrosion, ticks_per_step", [(True, 2), (False, 1)])
+def test_parts_on_the_ground(engine, per_bot_corrosion, ticks_per_step):
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+    grid = small_world(engine, per_bot_corrosion)
+    for _ in range(10):
+        grid.simulate_step()
+
+    assert [(part.x, part.y) for part in grid.parts] == [(15, 15), (5, 20)]
+    assert [part.enhancement_value for part in grid.parts] == pytest.approx(
+        [eager(PartSize.LARGE, 10 * ticks_per_step), eager(PartSize.MEDIUM, 10 * ticks_per_step)])
+
+
+@pytest.mark.parametrize("per_bot_corrosion, ticks", [(True, 1), (False, 0)])
+def test_picked_up_part_stops_corroding(per_bot_corrosion, ticks):
+    # per bot, the old loop corroded the part once (for the first bot) before it was picked up
+    grid = small_world("object", per_bot_corrosion)
+    for _ in range(10):
+        grid.simulate_step()
+
+    carrier = grid.bots[1]
+    assert carrier.carried_part.size is PartSize.SMALL
+    assert carrier.carried_part.enhancement_value == pytest.approx(eager(PartSize.SMALL, ticks))
+
+
+def test_value_never_goes_negative():
+    grid = TechburgGrid(10)
+    part = SparePart(1, 1, PartSize.SMALL)
+    grid._add_entity(grid.parts, part)
+    grid.corrosion.tick(10 ** 6)
+    assert part.enhancement_value == 0
@@ -0,0 +1,65 @@
+import pytest
+
+from RasterRenderer import RasterRenderer
+from RechargeStation import RechargeStation
+from SparePart import PART_COLOR, SparePart, PartSize
+from SurvivorBot import SurvivorBot
+from TechburgGrid import TechburgGrid
+from benchmark import StubCanvas, StubPhotoImage
+
+
+def pixel(renderer, frame: bytes, x: int, y: int) -> bytes:
+    i = 3 * (renderer.cell_pixel[y] * renderer.pixels + renderer.cell_pixel[x])
+    return frame[i:i + 3]
+
+
+def odd_world(size: int, engine: str = "object") -> TechburgGrid:
+    """ entities on odd cells only, which one-in-two subsampling would skip """
+    grid = TechburgGrid(size, engine=engine)
+    grid._add_entity(grid.stations, RechargeStation(size - 1, size - 1))
+    for i in range(1, 40, 2):
+        grid._add_entity(grid.bots, SurvivorBot(i * 37 % size | 1, i * 53 % size | 1))
+        grid._add_entity(grid.parts, SparePart(i * 71 % size | 1, i * 13 % size | 1, PartSize.LARGE))
+    if grid.engine is not None:
+        grid.engine.load()
+    return grid
+
+
+@pytest.mark.parametrize("size", [250, 1000, 1500, 2000])
+@pytest.mark.parametrize("engine", ["object", "numpy"])
+def test_every_entity_is_drawn(size, engine):
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+    grid = odd_world(size, engine)
+    renderer = RasterRenderer(StubCanvas(), size, photo_image=StubPhotoImage)
+    frame = renderer.build_frame(grid)
+
+    assert renderer.pixels == min(size, RasterRenderer.CANVAS_SIZE)
+    assert len(frame) == 3 * renderer.pixels ** 2
+    bot, part = renderer._color("bot"), renderer._color(PART_COLOR[PartSize.LARGE])
+    bot_pixels = {(renderer.cell_pixel[b.x], renderer.cell_pixel[b.y]) for b in grid.bots}
+    for b in grid.bots:
+        assert pixel(renderer, frame, b.x, b.y) == bot
+    for p in grid.parts:
+        # a bot sharing the part's block is the higher layer
+        expected = bot if (renderer.cell_pixel[p.x], renderer.cell_pixel[p.y]) in bot_pixels else part
+        assert pixel(renderer, frame, p.x, p.y) == expected
+    assert pixel(renderer, frame, size - 1, size - 1) == renderer._color("recharge_station")
+
+
+@pytest.mark.parametrize("size, images", [(250, 2), (1000, 1), (2000, 1)])
+def test_images_are_reused(size, images):
+    grid = odd_world(size)
+    canvas = StubCanvas()
+    created = []
+
+    def photo_image(**options):
+        created.append(options)
+        return StubPhotoImage(**options)
+
+    renderer = RasterRenderer(canvas, size, photo_image=photo_image)
+    for _ in range(3):
+        renderer.render(grid)
+    assert len(created) == images
+    assert created[-1]["width"] == created[-1]["height"] == min(size, 1000) * renderer.scale
+    assert canvas.next_item == 1
@@ -0,0 +1,60 @@
+import pytest
+
+from Drone import Drone
+from RechargeStation import RechargeStation
+from SurvivorBot import SurvivorBot
+from TechburgGrid import TechburgGrid
+
+
+def station_world(energy: float, target: float):
+    """ one bot resting at a station, nothing else on the grid """
+    grid = TechburgGrid(20, seed=3)
+    grid._add_entity(grid.stations, RechargeStation(10, 10))
+    bot = SurvivorBot(10, 10)
+    bot.energy = energy
+    bot.resting = True
+    bot.rest_energy_target = target
+    grid._add_entity(grid.bots, bot)
+    return grid, bot
+
+
+@pytest.mark.parametrize("energy, target", [(20.0, 60.0), (20.5, 35.0), (59.5, 60.0), (40.0, 40.0)])
+def test_parked_bot_matches_stepwise_rest(energy, target):
+    grid, bot = station_world(energy, target)
+    reference_grid, reference = station_world(energy, target)
+    # never parking is the old step-by-step station update
+    reference_grid._park_bot = lambda bot, step: None
+    for _ in range(60):
+        grid.simulate_step()
+        reference_grid.simulate_step()
+        assert bot.energy == pytest.approx(reference.energy)
+        assert (bot.x, bot.y, bot.resting) == (reference.x, reference.y, reference.resting)
+
+
+def test_permanent_rest_is_parked_without_a_wake_step():
+    grid, bot = station_world(30.0, 60.0)
+    for _ in range(5):
+        grid.simulate_step()
+    assert bot.clock is grid and bot.wake_step is None
+    assert all(b is not bot for b in grid._update_awake_bots())
+
+
+def test_energy_write_wakes_a_parked_bot():
+    grid, bot = station_world(30.0, 60.0)
+    for _ in range(5):
+        grid.simulate_step()
+    before = bot.energy
+    bot.energy = before - 10.0
+    assert bot.clock is None
+    assert bot.energy == before - 10.0
+    assert bot in grid._update_awake_bots()
+
+
+def test_drone_at_station_wakes_parked_bots():
+    grid, bot = station_world(30.0, 60.0)
+    for _ in range(3):
+        grid.simulate_step()
+    assert bot.clock is grid
+    grid._add_entity(grid.drones, Drone(10, 10))
+    grid.simulate_step()
+    assert bot.clock is None
@@ -0,0 +1,74 @@
+from SimulationState import SimulationState
+from StepHistory import StepHistory
+from batch import build_grid
+
+
+def full_snapshot(grid) -> dict:
+    state = SimulationState(grid.stations, grid.bots, grid.parts, grid.drones, grid.swarms, grid.step_count)
+    return vars(state)
+
+
+def run(history: StepHistory, steps: int, seed: int = 5) -> tuple:
+    """ step a world, recording every state; returns the grid and step count -> full snapshot """
+    grid = build_grid(40, 4, 40, 100, 12, 10, seed=seed)
+    history.record(grid, grid.step_count)
+    snapshots = {grid.step_count: full_snapshot(grid)}
+    for _ in range(steps):
+        grid.simulate_step()
+        history.record(grid, grid.step_count)
+        snapshots[grid.step_count] = full_snapshot(grid)
+    return grid, snapshots
+
+
+def test_deltas_rebuild_every_step():
+    history = StepHistory(keyframe_interval=7)
+    _, snapshots = run(history, 60)
+    assert len(history) == 61
+    assert sum(entry.keyframe for entry in history.entries) == 9
+    for i, entry in enumerate(history.entries):
+        assert vars(history.state_at(i)) == snapshots[entry.step_count]
+
+
+def test_step_back_and_forward():
+    history = StepHistory(keyframe_interval=10)
+    _, snapshots = run(history, 30)
+    for step in range(29, -1, -1):
+        assert vars(history.step_back()) == snapshots[step]
+    assert not history.can_step_back()
+    for step in range(1, 31):
+        assert vars(history.step_forward()) == snapshots[step]
+    assert not history.can_step_forward()
+
+
+def test_restore_then_record():
+    # like SimulationWorker: step back, rebuild the grid from the state and carry on from there
+    history = StepHistory(keyframe_interval=10)
+    grid, snapshots = run(history, 25)
+    for _ in range(8):
+        state = history.step_back()
+    grid.clear_entities()
+    grid.restore_from_state(state)
+    history.restored()
+    assert grid.step_count == 17
+    assert len(history) == 26      # nothing is dropped until a new step is recorded
+
+    for _ in range(12):
+        grid.simulate_step()
+        history.record(grid, grid.step_count)
+        snapshots[grid.step_count] = full_snapshot(grid)
+    assert len(history) == 18 + 12
+    for i, entry in enumerate(history.entries):
+        assert vars(history.state_at(i)) == snapshots[entry.step_count]
+
+
+def test_budget_drops_whole_keyframe_groups():
+    history = StepHistory(budget_bytes=0, keyframe_interval=5)
+    _, unbounded = run(StepHistory(keyframe_interval=5), 40)
+    _, snapshots = run(history, 40)
+    # over any budget only the cursor's group survives
+    assert 0 < len(history) <= 5
+    assert history.entries[0].keyframe
+    assert history.cursor == len(history) - 1
+    assert history.nbytes == sum(entry.nbytes for entry in history.entries)
+    for i, entry in enumerate(history.entries):
+        assert vars(history.state_at(i)) == snapshots[entry.step_count] == unbounded[entry.step_count]
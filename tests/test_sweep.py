@@ -0,0 +1,19 @@
+import pytest
+
+import sweep
+
+
+@pytest.mark.parametrize("content", [b"", b"partial", b"a\n", b"a\nbc", b"\n\n",
+                                     b"x" * 100000 + b"\n" + b"y" * 200000, b"line\n" * 50000 + b"tail"])
+@pytest.mark.parametrize("block", [1, 7, sweep.TAIL_BLOCK])
+def test_drop_partial_line(tmp_path, monkeypatch, content, block):
+    monkeypatch.setattr(sweep, "TAIL_BLOCK", block)
+    path = tmp_path / "sweep.jsonl"
+    path.write_bytes(content)
+    sweep.drop_partial_line(str(path))
+    assert path.read_bytes() == content[:content.rfind(b"\n") + 1]
+
+
+def test_drop_partial_line_without_file(tmp_path):
+    sweep.drop_partial_line(str(tmp_path / "missing.jsonl"))
+    assert not (tmp_path / "missing.jsonl").exists()